@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Measure the memory each entry costs in the different in-memory layouts.
+
+    python benchmarks/entry_memory.py [--sizes 100000 1000000]
+
+Sizes are traced with tracemalloc, so they include the names, values and
+timestamps themselves, not just the containers.
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from core.entry_store import Entry
+from core.ranking import Ranking
+
+
+def generate_entries(count, seed=0):
+    """Yield entry dicts shaped like a loaded tally file"""
+    rng = random.Random(seed)
+    start = 1.7e9
+    for i in range(count):
+        yield {"name": f"Player {i:07d}", "value": rng.randint(0, 5000),
+               "last_updated": start + rng.random() * 1e7}
+
+
+def traced_size(build):
+    """Bytes still allocated by what build() returns"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+LAYOUTS = {
+    "list of dicts": lambda count: list(generate_entries(count)),
+    "list of Entry": lambda count: [Entry.from_dict(entry) for entry in generate_entries(count)],
+    "Ranking": lambda count: Ranking(generate_entries(count)),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args(argv)
+
+    print(f"{'layout':<16} {'entries':>10} {'total MB':>10} {'bytes/entry':>12}")
+    for count in args.sizes:
+        for label, build in LAYOUTS.items():
+            size = traced_size(lambda: build(count))
+            print(f"{label:<16} {count:>10} {size / 2**20:>10.1f} {size / count:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
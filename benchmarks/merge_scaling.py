@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Measure how merging many tally files scales with worker processes.
+
+    python benchmarks/merge_scaling.py [--files 200] [--entries 5000] [--workers 1 2 4 8]
+
+Synthetic event nights (same seed every run) are written to a temporary
+directory, each holding a random share of one pool of players, and merged
+with each worker count. Reports seconds, files per second and the speedup
+over the first worker count; near-linear scaling needs as many free cores
+as workers.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from core.merge import merge_files
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', 'src', 'core', 'schema.json')
+
+# Share of the player pool that shows up on a given night
+ATTENDANCE = 0.6
+
+
+def write_nights(directory, files, entries, seed=0):
+    """Write `files` tally files of about `entries` entries each"""
+    rng = random.Random(seed)
+    pool = int(entries / ATTENDANCE)
+    paths = []
+    for night in range(files):
+        start = 1.7e9 + night * 86400
+        players = rng.sample(range(pool), entries)
+        data = {"title": f"Night {night + 1}",
+                "entries": [{"name": f"Player {i:07d}", "value": rng.randint(0, 50),
+                             "last_updated": start + rng.random() * 14400} for i in players]}
+        path = os.path.join(directory, f"night-{night:04d}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        paths.append(path)
+    return paths
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1))) or [1]
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--entries", type=int, default=5000, help="entries per file")
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"Writing {args.files} files of {args.entries} entries...", flush=True)
+        paths = write_nights(directory, args.files, args.entries)
+        print(f"{cpus} CPUs")
+        print(f"{'workers':>7}  {'seconds':>8}  {'files/s':>8}  {'speedup':>7}")
+        baseline = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            merge_files(SCHEMA_PATH, paths, workers)
+            seconds = time.perf_counter() - start
+            baseline = baseline or seconds
+            print(f"{workers:>7}  {seconds:>8.2f}  {args.files / seconds:>8.0f}  "
+                  f"{baseline / seconds:>6.2f}x", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""Time the operations that grow with the size of a board.
+
+    python benchmarks/run_benchmarks.py [--sizes 100 1000 ...] [--repeat 5] [--output results.json]
+    python benchmarks/run_benchmarks.py --compare baseline.json [--threshold 0.25]
+    python benchmarks/run_benchmarks.py --results new.json --compare baseline.json
+
+Boards of synthetic entries (10^2 to 10^6 by default, same seed every run)
+are loaded, validated, saved, ranked and rendered, and stored as a SQLite
+database to time saving a few changes and its rank queries; the window's own
+refresh_display, generate_simple_dump and _capture_current_state are timed on
+an offscreen Qt window when PyQt5 is available. Each case reports the best
+and median of its runs in seconds as JSON. With --compare, cases that got
+slower than the stored baseline by more than the threshold are listed and
+the exit status is 1.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from core.data_manager import DataManager
+from core.dump import DumpRenderer
+from core.history import History, LAST_UPDATE
+from core.ranking import Ranking
+from core.sqlite_store import SqliteTally
+from entry_memory import generate_entries
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', 'src', 'core', 'schema.json')
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+# Boards this large take seconds per run, so they are timed fewer times
+LARGE_BOARD = 100_000
+LARGE_BOARD_REPEAT = 3
+# Share of entries changed between runs of the change tracking cases
+CHANGED_SHARE = 0.01
+# Differences below this are timer noise, whatever the ratio
+NOISE_SECONDS = 0.0005
+
+
+def measure(run, repeat, setup=None):
+    """Best and median seconds of `repeat` calls to run(), each after an untimed setup()"""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return {"min": min(times), "median": statistics.median(times), "runs": repeat}
+
+
+def change_some(ranking, rng):
+    """Bump a share of the entries so change tracking has something to do"""
+    names = [entry.name for entry in ranking.window(0, len(ranking))]
+    for name in rng.sample(names, max(1, int(len(names) * CHANGED_SHARE))):
+        ranking.adjust(name, rng.randint(-5, 5) or 1)
+
+
+def core_cases(count, repeat, directory):
+    """Cases that need nothing but the core modules"""
+    data_manager = DataManager(SCHEMA_PATH)
+    entries = list(generate_entries(count))
+    file_path = os.path.join(directory, f"bench-{count}.json")
+    data_manager.save_file(file_path, "Benchmark", entries)
+    data = data_manager.load_file(file_path)
+    rng = random.Random(count)
+
+    results = {
+        "load_file": measure(lambda: data_manager.load_file(file_path), repeat),
+        "validate_data": measure(lambda: data_manager.validate_data(data), repeat),
+        "save_file": measure(lambda: data_manager.save_file(file_path, "Benchmark", entries), repeat),
+        "rank": measure(lambda: Ranking(entries), repeat),
+    }
+
+    ranking = Ranking(entries)
+    history = History(ranking)
+    history.mark(LAST_UPDATE)
+    renderer = DumpRenderer(ranking)
+    renderer.render("Benchmark", history.get(LAST_UPDATE))
+    results["dump_render"] = measure(
+        lambda: renderer.render("Benchmark", history.get(LAST_UPDATE)), repeat,
+        setup=lambda: change_some(ranking, rng))
+    results["history_mark"] = measure(
+        lambda: history.mark(LAST_UPDATE), repeat, setup=lambda: change_some(ranking, rng))
+
+    results.update(sqlite_cases(data_manager, ranking, count, repeat, directory, rng))
+    return results
+
+
+def sqlite_cases(data_manager, ranking, count, repeat, directory, rng):
+    """The same board as a SQLite database: loading, saving a few changes, rank queries"""
+    file_path = os.path.join(directory, f"bench-{count}.sqlite")
+    data_manager.save_file(file_path, "Benchmark", ranking.to_list())
+    ranking.clear_changes()
+    pending = {}
+
+    def change_and_collect():
+        change_some(ranking, rng)
+        pending["entries"], pending["changed"] = ranking.to_list(), ranking.changed_names()
+        ranking.clear_changes()
+
+    results = {
+        "load_file.sqlite": measure(lambda: data_manager.load_file(file_path), repeat),
+        "save_file.sqlite_changed": measure(
+            lambda: data_manager.save_file(file_path, "Benchmark", pending["entries"],
+                                           pending["changed"]),
+            repeat, setup=change_and_collect),
+    }
+    middle = ranking.entry_at(count // 2).name
+    with SqliteTally(file_path) as database:
+        results["sqlite.top_100"] = measure(lambda: database.top(100), repeat)
+        results["sqlite.rank_of"] = measure(lambda: database.rank_of(middle), repeat)
+    return results
+
+
+def make_window():
+    """An offscreen tally window with settings kept out of the user's home, or None without PyQt5"""
+    try:
+        from PyQt5.QtWidgets import QApplication
+    except ImportError:
+        return None
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.environ["HOME"] = tempfile.mkdtemp(prefix="tally-bench-")
+    from ui.pyqt_window import PyQtTallyApp
+
+    app = QApplication.instance() or QApplication([])
+    window = PyQtTallyApp()
+    window.file_check_timer.stop()
+    window.show()
+    app.processEvents()
+    return app, window
+
+
+def window_cases(app, window, count, repeat):
+    """Cases that go through the real widgets"""
+    entries = list(generate_entries(count))
+    rng = random.Random(count)
+    # Alternate between two identical boards so every run shows a new ranking
+    boards = [Ranking(entries), Ranking(entries)]
+
+    def show_next_board():
+        window.ranking = boards[0] if window.ranking is boards[1] else boards[1]
+
+    def refresh():
+        window.refresh_display()
+        app.processEvents()
+
+    results = {"window.refresh_display": measure(refresh, repeat, setup=show_next_board)}
+
+    window.ranking = boards[0]
+    window._reset_baselines()
+    refresh()
+    window.generate_simple_dump()
+    results["window.generate_simple_dump"] = measure(
+        window.generate_simple_dump, repeat, setup=lambda: change_some(window.ranking, rng))
+    results["window._capture_current_state"] = measure(
+        window._capture_current_state, repeat, setup=lambda: change_some(window.ranking, rng))
+
+    # Leave the window holding nothing large before the next size
+    window.ranking = Ranking()
+    window._reset_baselines()
+    refresh()
+    return results
+
+
+def run(sizes, repeat, use_qt=True):
+    """Run every case at every size; returns the JSON-ready report"""
+    gui = make_window() if use_qt else None
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "qt": gui is not None,
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for count in sizes:
+            runs = repeat if count < LARGE_BOARD else max(1, min(repeat, LARGE_BOARD_REPEAT))
+            cases = core_cases(count, runs, directory)
+            if gui is not None:
+                cases.update(window_cases(*gui, count, runs))
+            for name, timing in cases.items():
+                report["results"].setdefault(name, {})[str(count)] = timing
+                print(f"{name:<32} {count:>9} {timing['min']:>10.4f}s", file=sys.stderr)
+    if gui is not None:
+        gui[1].close()
+    return report
+
+
+def compare(baseline, current, threshold):
+    """(case, size, old, new) for every case more than `threshold` slower than the baseline"""
+    regressions = []
+    for name, by_size in current["results"].items():
+        for size, timing in by_size.items():
+            old = baseline["results"].get(name, {}).get(size)
+            if old is None:
+                continue
+            before, after = old["min"], timing["min"]
+            if after > before * (1 + threshold) and after - before > NOISE_SECONDS:
+                regressions.append((name, int(size), before, after))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case (default: 5)")
+    parser.add_argument("--no-qt", action="store_true", help="skip the offscreen window cases")
+    parser.add_argument("--output", "-o", help="write the JSON report here instead of stdout")
+    parser.add_argument("--results", help="compare a stored report instead of running")
+    parser.add_argument("--compare", metavar="BASELINE", help="report to check for regressions against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="slowdown that counts as a regression (default: 0.25 = 25%%)")
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    if args.results:
+        with open(args.results, encoding="utf-8") as f:
+            report = json.load(f)
+    else:
+        report = run(args.sizes, args.repeat, use_qt=not args.no_qt)
+        text = json.dumps(report, indent=2)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        elif not args.compare:
+            print(text)
+
+    if not args.compare:
+        return 0
+    with open(args.compare, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(baseline, report, args.threshold)
+    for name, size, before, after in regressions:
+        print(f"REGRESSION {name} at {size} entries: {before:.4f}s -> {after:.4f}s "
+              f"({after / before - 1:+.0%})")
+    if not regressions:
+        print(f"No regressions over {args.threshold:.0%} against {args.compare}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Measure how many increments per second the scoring server takes on localhost.
+
+    python benchmarks/server_throughput.py [--entries 1000] [--clients 10] [--requests 2000]
+
+The server runs in this process on a free port over a temporary tally file;
+each client holds one keep-alive connection and sends single-increment
+requests back to back.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from core.data_manager import DataManager
+from server.tally_server import TallyServer
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', 'src', 'core', 'schema.json')
+
+
+def start_server(file_path, commit_interval):
+    """Run a server on its own event loop thread; returns (server, loop)"""
+    server = TallyServer(DataManager(SCHEMA_PATH), file_path, port=0,
+                         commit_interval=commit_interval)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.start())
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    started.wait()
+    return server, loop
+
+
+async def _client(port, names, requests, seed):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for _ in range(requests):
+        body = json.dumps({"records": [["d", rng.choice(names), 1]]}).encode("utf-8")
+        writer.write(b"POST /records HTTP/1.1\r\nHost: localhost\r\n"
+                     b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+        await writer.drain()
+        status = await reader.readline()
+        if b" 200 " not in status:
+            raise RuntimeError(f"Request failed: {status!r}")
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line == b"\r\n":
+                break
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":")[1])
+        await reader.readexactly(length)
+    writer.close()
+
+
+async def _run_clients(port, names, clients, requests):
+    await asyncio.gather(*[_client(port, names, requests, seed) for seed in range(clients)])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1000)
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per client")
+    parser.add_argument("--commit-interval", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    names = [f"Player {i}" for i in range(args.entries)]
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "bench.json")
+        DataManager(SCHEMA_PATH).save_file(file_path, "Benchmark", [
+            {"name": name, "value": 0, "last_updated": 0.0} for name in names])
+
+        server, loop = start_server(file_path, args.commit_interval)
+        start = time.perf_counter()
+        asyncio.run(_run_clients(server.port, names, args.clients, args.requests))
+        elapsed = time.perf_counter() - start
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+        total = args.clients * args.requests
+        saved = sum(entry["value"] for entry in DataManager(SCHEMA_PATH).load_file(file_path)["entries"])
+        print(f"{total} increments from {args.clients} clients in {elapsed:.2f}s: "
+              f"{total / elapsed:,.0f}/s ({saved} committed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Measure how fast the window takes rapid-fire scoring and how soon it shows it.
+
+    python benchmarks/ui_scoring.py [--sizes 1000 100000] [--seconds 3] [--rate 0] [--immediate]
+
+An offscreen window holds a board of synthetic entries with one entry in the
+middle selected, and the + key is sent to the list as fast as the event loop
+takes it (or --rate presses per second) for a few seconds. Reports presses
+handled per second, list redraws, and the latency from each press to the
+first repaint showing it. --immediate redraws after every press instead of
+once a frame, for comparison.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from core.ranking import Ranking
+from entry_memory import generate_entries
+from run_benchmarks import make_window
+
+
+def score(app, window, count, seconds, rate, immediate):
+    from PyQt5.QtCore import QEvent, QObject, Qt, QTimer
+    from PyQt5.QtTest import QTest
+
+    window.ranking = Ranking(generate_entries(count))
+    window._reset_baselines()
+    window.refresh_display()
+    window._select_entry(window.ranking.entry_at(count // 2).name)
+    window.entries_list.setFocus()
+    app.processEvents()
+
+    presses, flushes, paints = [], [], []
+
+    class PaintRecorder(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint:
+                paints.append(time.perf_counter())
+            return False
+
+    recorder = PaintRecorder()
+    window.entries_list.viewport().installEventFilter(recorder)
+    window.update_scheduler.flushed.connect(lambda: flushes.append(time.perf_counter()))
+
+    def press():
+        if time.perf_counter() - start >= seconds:
+            timer.stop()
+            return
+        presses.append(time.perf_counter())
+        QTest.keyClick(window.entries_list, Qt.Key_Plus)
+        if immediate:
+            window.update_scheduler.flush()
+
+    timer = QTimer()
+    timer.setInterval(int(1000 / rate) if rate else 0)
+    timer.timeout.connect(press)
+    start = time.perf_counter()
+    timer.start()
+    while timer.isActive():
+        app.processEvents()
+    window.update_scheduler.flush()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    window.entries_list.viewport().removeEventFilter(recorder)
+
+    # A press is visible at the first repaint after the redraw that included it
+    latencies = []
+    flush_index = paint_index = 0
+    for pressed in presses:
+        while flush_index < len(flushes) and flushes[flush_index] < pressed:
+            flush_index += 1
+        if flush_index == len(flushes):
+            break
+        while paint_index < len(paints) and paints[paint_index] < flushes[flush_index]:
+            paint_index += 1
+        if paint_index == len(paints):
+            break
+        latencies.append(paints[paint_index] - pressed)
+    latencies.sort()
+
+    window.ranking = Ranking()
+    window._reset_baselines()
+    window.refresh_display()
+    return {
+        "presses": len(presses),
+        "presses_per_second": len(presses) / elapsed,
+        "redraws": len(flushes),
+        "latency_p50": statistics.median(latencies) if latencies else None,
+        "latency_p99": latencies[int(0.99 * (len(latencies) - 1))] if latencies else None,
+        "latency_max": latencies[-1] if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--rate", type=float, default=0,
+                        help="presses per second, 0 for as fast as possible")
+    parser.add_argument("--immediate", action="store_true",
+                        help="redraw after every press instead of once a frame")
+    args = parser.parse_args()
+
+    gui = make_window()
+    if gui is None:
+        sys.exit("PyQt5 is needed for this benchmark")
+    print(f"{'entries':>8}  {'presses':>7}  {'per sec':>8}  {'redraws':>7}  "
+          f"{'p50 ms':>7}  {'p99 ms':>7}  {'max ms':>7}")
+    for count in args.sizes:
+        result = score(*gui, count, args.seconds, args.rate, args.immediate)
+        latency = [f"{result[key] * 1000:7.1f}" if result[key] is not None else f"{'-':>7}"
+                   for key in ("latency_p50", "latency_p99", "latency_max")]
+        print(f"{count:>8}  {result['presses']:>7}  {result['presses_per_second']:>8.0f}  "
+              f"{result['redraws']:>7}  {'  '.join(latency)}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""Headless command line interface for tally files.
+
+Nothing here imports Qt, and core modules are imported inside the commands
+that need them so simple commands start quickly.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', 'core', 'schema.json')
+
+
+def _data_manager():
+    from core.data_manager import DataManager
+    return DataManager(SCHEMA_PATH)
+
+
+def _load(file_path):
+    """Load a tally file into (data manager, title, ranking)"""
+    from core.ranking import Ranking
+    data_manager = _data_manager()
+    data = data_manager.load_file(file_path)
+    return data_manager, data["title"], Ranking(data["entries"])
+
+
+def _open_ranked(file_path):
+    """The open file if `file_path` is a database or columnar file with nothing
+    journaled, else None; either answers rank queries without loading every entry"""
+    from core import columnar, journal, sqlite_store
+    if os.path.exists(journal.journal_path(file_path)):
+        return None
+    if sqlite_store.is_sqlite_path(file_path):
+        return sqlite_store.SqliteTally(file_path)
+    if columnar.is_columnar_path(file_path):
+        return columnar.ColumnarTally(file_path)
+    return None
+
+
+def _save(args, data_manager, title, ranking, records):
+    """Write a mutation back, either as journal records or as a full save"""
+    if args.journal:
+        for record in records:
+            data_manager.append_journal(args.file, record)
+        data_manager.checkpoint(args.file, title, ranking.to_list(), ranking.changed_names())
+        data_manager.close_journal(args.file)
+    else:
+        data_manager.save_file(args.file, title, ranking.to_list(), ranking.changed_names())
+
+
+# Commands
+
+def _parse_ranks(text):
+    """Parse an inclusive 1-based rank range like '100-200'"""
+    try:
+        first, last = (int(part) for part in text.split("-", 1))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a rank range like 10-20, got '{text}'")
+    if first < 1 or last < first:
+        raise argparse.ArgumentTypeError(f"invalid rank range '{text}'")
+    return first, last
+
+
+def _write_dump(args, title, ranking, baseline):
+    """Stream the dump to stdout with the filters given on the command line"""
+    from core.dump import DumpRenderer
+    if args.changed and baseline is None:
+        raise ValueError("--changed needs a baseline; use --since or diff")
+    DumpRenderer(ranking).write(sys.stdout, title, baseline, top=args.top,
+                                ranks=args.ranks, changed_only=args.changed)
+
+
+def _baseline_from_file(ranking, file_path):
+    from core.history import History
+    old_data = _data_manager().load_file(file_path)
+    return History(ranking).mark_from_entries(file_path, old_data["entries"])
+
+
+def cmd_dump(args):
+    if args.top and not (args.since or args.ranks or args.changed):
+        tally = _open_ranked(args.file)
+        if tally is not None:
+            from core.ranking import Ranking
+            with tally:
+                title, ranking = tally.title, Ranking(tally.top(args.top))
+            _write_dump(args, title, ranking, None)
+            return
+    _, title, ranking = _load(args.file)
+    # Without a baseline every entry is shown as new, like a fresh window
+    baseline = _baseline_from_file(ranking, args.since) if args.since else None
+    _write_dump(args, title, ranking, baseline)
+
+
+def cmd_diff(args):
+    _, title, ranking = _load(args.new_file)
+    _write_dump(args, title, ranking, _baseline_from_file(ranking, args.old_file))
+
+
+def cmd_rank(args):
+    tally = _open_ranked(args.file)
+    if tally is not None:
+        with tally:
+            found = {name: (tally.rank_of(name), tally.get(name)) for name in args.names}
+        found = {name: (rank, entry["value"]) for name, (rank, entry) in found.items() if rank}
+    else:
+        _, _, ranking = _load(args.file)
+        found = {name: (ranking.rank_of(name), ranking.get(name).value)
+                 for name in args.names if name in ranking}
+    for name in args.names:
+        if name not in found:
+            raise ValueError(f"No entry named '{name}'")
+    for name in args.names:
+        rank, value = found[name]
+        print(f"{rank:2d} {name} {value} points")
+
+
+def cmd_new(args):
+    if os.path.exists(args.file):
+        raise ValueError(f"File already exists: {args.file}")
+    _data_manager().save_file(args.file, args.title, [])
+
+
+def cmd_title(args):
+    from core import journal
+    data_manager, _, ranking = _load(args.file)
+    _save(args, data_manager, args.title, ranking, [[journal.TITLE, args.title]])
+
+
+def cmd_add(args):
+    import time
+    from core import journal
+    data_manager, title, ranking = _load(args.file)
+    records = []
+    for name in args.names:
+        name = name.strip()
+        if not name:
+            continue
+        if name in ranking:
+            raise ValueError(f"Entry '{name}' already exists")
+        entry = ranking.add(name, 0, time.time())
+        records.append([journal.ADD, name, 0, entry.last_updated])
+    _save(args, data_manager, title, ranking, records)
+
+
+def _cmd_adjust(args, sign):
+    import time
+    from core import journal
+    data_manager, title, ranking = _load(args.file)
+    if args.name not in ranking:
+        raise ValueError(f"No entry named '{args.name}'")
+    entry = ranking.adjust(args.name, sign * args.amount, time.time())
+    _save(args, data_manager, title, ranking,
+          [[journal.DELTA, args.name, sign * args.amount, entry.last_updated]])
+
+
+def cmd_inc(args):
+    _cmd_adjust(args, 1)
+
+
+def cmd_dec(args):
+    _cmd_adjust(args, -1)
+
+
+def cmd_rename(args):
+    from core import journal
+    data_manager, title, ranking = _load(args.file)
+    if args.old_name not in ranking:
+        raise ValueError(f"No entry named '{args.old_name}'")
+    new_name = args.new_name.strip()
+    if not new_name:
+        raise ValueError("The new name is empty")
+    ranking.rename(args.old_name, new_name)
+    _save(args, data_manager, title, ranking, [[journal.RENAME, args.old_name, new_name]])
+
+
+def cmd_import(args):
+    from core import journal
+    from core.bulk_import import aggregate_events, read_events
+    data_manager, title, ranking = _load(args.file)
+    changes = aggregate_events(read_events(args.events))
+    added = set(ranking.apply_bulk(changes))
+    records = [[journal.ADD if name in added else journal.DELTA, name, delta, last_updated]
+               for name, (delta, last_updated) in changes.items()]
+    _save(args, data_manager, title, ranking, records)
+    print(f"Updated {len(changes) - len(added)} entries and added {len(added)}")
+
+
+def cmd_convert(args):
+    data_manager = _data_manager()
+    data = data_manager.load_file(args.source)
+    data_manager.save_file(args.destination, data["title"], data["entries"])
+
+
+def cmd_merge(args):
+    from core.merge import merge_files
+    output = os.path.realpath(args.output)
+    inputs = [os.path.realpath(path) for path in args.inputs]
+    if output in inputs:
+        raise ValueError(f"The output file is also an input: {args.output}")
+    if len(set(inputs)) < len(inputs):
+        raise ValueError("An input file is listed more than once")
+    if os.path.exists(args.output) and not args.force:
+        raise ValueError(f"File already exists: {args.output} (use --force to replace it)")
+    if args.workers is not None and args.workers < 1:
+        raise ValueError("--workers must be at least 1")
+    entries = merge_files(SCHEMA_PATH, args.inputs, args.workers)
+    _data_manager().save_file(args.output, args.title, entries)
+    print(f"Merged {len(args.inputs)} files into {len(entries)} entries")
+
+
+def cmd_serve(args):
+    import asyncio
+    from server.tally_server import TallyServer
+    server = TallyServer(_data_manager(), args.file, args.host, args.port, args.commit_interval)
+    print(f"Serving {args.file} on http://{args.host}:{args.port} (Ctrl+C to stop)", flush=True)
+    try:
+        asyncio.run(server.run())
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        raise RuntimeError(f"Cannot serve on {args.host}:{args.port}: {e}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="tally", description="Work with tally files without the GUI")
+    parser.add_argument("--perf-trace", metavar="FILE",
+                        help="time the command and write a Chrome trace file")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.required = True
+
+    def add_command(name, func, help_text, mutates=True):
+        command = commands.add_parser(name, help=help_text)
+        command.set_defaults(func=func)
+        if mutates:
+            command.add_argument("--journal", action="store_true",
+                                 help="append the change to the file's journal instead of rewriting it")
+        return command
+
+    def add_dump_filters(command):
+        command.add_argument("--top", type=int, metavar="N", help="only the first N ranks")
+        command.add_argument("--ranks", type=_parse_ranks, metavar="FIRST-LAST",
+                             help="only ranks FIRST to LAST")
+        command.add_argument("--changed", action="store_true",
+                             help="only entries that are new, moved or changed value")
+
+    command = add_command("dump", cmd_dump, "print the ranking as a simple dump", mutates=False)
+    command.add_argument("file")
+    command.add_argument("--since", metavar="OLD_FILE", help="show changes since OLD_FILE")
+    add_dump_filters(command)
+
+    command = add_command("diff", cmd_diff, "print a dump of NEW_FILE with changes since OLD_FILE",
+                          mutates=False)
+    command.add_argument("old_file")
+    command.add_argument("new_file")
+    add_dump_filters(command)
+
+    command = add_command("rank", cmd_rank, "print the rank and points of entries", mutates=False)
+    command.add_argument("file")
+    command.add_argument("names", nargs="+")
+
+    command = add_command("new", cmd_new, "create an empty tally file", mutates=False)
+    command.add_argument("file")
+    command.add_argument("--title", default="New Tally List")
+
+    command = add_command("title", cmd_title, "change the title")
+    command.add_argument("file")
+    command.add_argument("title")
+
+    command = add_command("add", cmd_add, "add entries starting at 0 points")
+    command.add_argument("file")
+    command.add_argument("names", nargs="+")
+
+    for name, func, verb in (("inc", cmd_inc, "increment"), ("dec", cmd_dec, "decrement")):
+        command = add_command(name, func, f"{verb} an entry")
+        command.add_argument("file")
+        command.add_argument("name")
+        command.add_argument("amount", nargs="?", type=int, default=1)
+
+    command = add_command("rename", cmd_rename, "rename an entry")
+    command.add_argument("file")
+    command.add_argument("old_name")
+    command.add_argument("new_name")
+
+    command = add_command("import", cmd_import, "apply a CSV or JSONL file of scoring events")
+    command.add_argument("file")
+    command.add_argument("events")
+
+    command = add_command("convert", cmd_convert,
+                          "copy a tally file to another format, chosen by extension (.json, .tally or .sqlite)",
+                          mutates=False)
+    command.add_argument("source")
+    command.add_argument("destination")
+
+    command = add_command("merge", cmd_merge, "sum the scores of several tally files into a new one",
+                          mutates=False)
+    command.add_argument("output")
+    command.add_argument("inputs", nargs="+")
+    command.add_argument("--title", default="Season Totals")
+    command.add_argument("--workers", type=int, metavar="N",
+                         help="processes to load the files with (default: one per CPU)")
+    command.add_argument("--force", action="store_true", help="replace OUTPUT if it exists")
+
+    command = add_command("serve", cmd_serve, "share a tally file with several scorekeepers over HTTP",
+                          mutates=False)
+    command.add_argument("file")
+    command.add_argument("--host", default="127.0.0.1")
+    command.add_argument("--port", type=int, default=8765)
+    command.add_argument("--commit-interval", type=float, default=1.0, metavar="SECONDS",
+                         help="how often applied changes are written to the file")
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.perf_trace:
+        from core import perf
+        perf.enable()
+    try:
+        args.func(args)
+    except BrokenPipeError:
+        # Output piped into e.g. head was cut short; that is not an error
+        sys.stdout = open(os.devnull, 'w')
+        return 0
+    except (ValueError, RuntimeError, FileNotFoundError) as e:
+        print(f"tally: error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if args.perf_trace:
+            from core import perf
+            try:
+                perf.write_trace(args.perf_trace)
+            except RuntimeError as e:
+                print(f"tally: error: {e}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
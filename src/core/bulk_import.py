@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import csv
+import json
+import os
+from typing import Dict, Iterable, Iterator, Tuple
+
+# One scoring event: (name, delta, timestamp)
+Event = Tuple[str, int, float]
+
+
+def _parse_event(name, delta, timestamp, where: str) -> Event:
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError(f"{where}: missing entry name")
+    try:
+        if isinstance(delta, str):
+            delta = int(delta.strip())
+        elif isinstance(delta, float) and delta.is_integer():
+            delta = int(delta)
+        elif type(delta) is not int:
+            raise TypeError
+        timestamp = float(timestamp)
+    except (TypeError, ValueError):
+        raise ValueError(f"{where}: delta must be an integer and timestamp a number")
+    return name.strip(), delta, timestamp
+
+
+def read_events(file_path: str) -> Iterator[Event]:
+    """Read scoring events from a CSV (name,delta,timestamp header) or JSONL file"""
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        if file_path.lower().endswith(".csv"):
+            reader = csv.DictReader(f)
+            missing = {"name", "delta", "timestamp"} - set(reader.fieldnames or [])
+            if missing:
+                raise ValueError(f"CSV is missing columns: {', '.join(sorted(missing))}")
+            for row in reader:
+                yield _parse_event(row["name"], row["delta"], row["timestamp"],
+                                   f"Line {reader.line_num}")
+        else:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                    yield _parse_event(row["name"], row["delta"], row["timestamp"],
+                                       f"Line {number}")
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    raise ValueError(f"Line {number}: expected an object with name, delta and timestamp")
+
+
+def aggregate_events(events: Iterable[Event]) -> Dict[str, Tuple[int, float]]:
+    """Group events by name into (total delta, time the final value was reached).
+
+    Every non-zero event changes the value, so the final value is reached at
+    the latest non-zero event, whatever order the rows arrive in. Names whose
+    events are all zero leave their entry untouched and are dropped.
+    """
+    totals: Dict[str, int] = {}
+    reached: Dict[str, float] = {}
+    for name, delta, timestamp in events:
+        if not delta:
+            continue
+        totals[name] = totals.get(name, 0) + delta
+        if timestamp > reached.get(name, float("-inf")):
+            reached[name] = timestamp
+    return {name: (total, reached[name]) for name, total in totals.items()}
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""Memory-mapped columnar tally files (*.tally).
+
+Same logical content as a JSON tally file, laid out as little-endian columns:
+
+    header   magic, version, entry count and the offset of every section
+    title    UTF-8
+    values   int64 per entry
+    stamps   float64 per entry (last_updated)
+    kinds    uint8 per entry; 1 if last_updated was an integer in JSON
+    names    uint64 offset per entry plus one end offset, into the string table
+    order    uint32 row numbers sorted by name, for O(log n) lookups
+    strings  UTF-8 names back to back
+
+Entries keep their file order, so converting JSON -> tally -> JSON gives the
+same data back. Opening only maps the file; values and timestamps of existing
+entries can be overwritten in place without rewriting anything else, and the
+rank of a name or the top of the board come from a scan of the value and
+timestamp columns without decoding any other entry.
+"""
+
+import heapq
+import mmap
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+SUFFIX = ".tally"
+MAGIC = b"TALLYCOL"
+VERSION = 1
+
+# magic, version, count, then offsets of title (plus its length), values,
+# stamps, kinds, names, order and strings
+_HEADER = struct.Struct("<8sIQ8Q")
+_VALUE = struct.Struct("<q")
+_STAMP = struct.Struct("<d")
+_OFFSET = struct.Struct("<Q")
+_ROW = struct.Struct("<I")
+
+_FLOAT_STAMP = 0
+_INT_STAMP = 1
+
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def is_columnar_path(file_path: str) -> bool:
+    """Whether a path names a columnar tally file"""
+    return file_path.lower().endswith(SUFFIX)
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _encode_name(name: str) -> bytes:
+    # surrogatepass keeps lone surrogates that JSON allows in strings
+    return name.encode("utf-8", "surrogatepass")
+
+
+def _decode_name(data: bytes) -> str:
+    return data.decode("utf-8", "surrogatepass")
+
+
+def _stamp_kind(last_updated, name: str) -> int:
+    if type(last_updated) is int:
+        if float(last_updated) != last_updated:
+            raise ValueError(f"Timestamp of '{name}' cannot be stored exactly: {last_updated}")
+        return _INT_STAMP
+    return _FLOAT_STAMP
+
+
+def _check_value(value: int, name: str) -> None:
+    if not -2 ** 63 <= value < 2 ** 63:
+        raise ValueError(f"Value of '{name}' does not fit in 64 bits: {value}")
+
+
+def _column_bytes(column: array) -> bytes:
+    if _BIG_ENDIAN:
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def encode_tally(title: str, entries: Iterable[Dict]) -> bytes:
+    """Build the contents of a columnar tally file"""
+    values = array("q")
+    stamps = array("d")
+    kinds = bytearray()
+    names: List[str] = []
+    encoded: List[bytes] = []
+    for entry in entries:
+        name = entry["name"]
+        try:
+            values.append(entry["value"])
+        except OverflowError:
+            raise ValueError(f"Value of '{name}' does not fit in 64 bits: {entry['value']}")
+        kinds.append(_stamp_kind(entry["last_updated"], name))
+        stamps.append(entry["last_updated"])
+        names.append(name)
+        encoded.append(_encode_name(name))
+
+    count = len(names)
+    if count >= 2 ** 32:
+        raise ValueError("Too many entries for a tally file")
+    order = array("I", sorted(range(count), key=names.__getitem__))
+
+    title_bytes = _encode_name(title)
+    title_offset = _HEADER.size
+    values_offset = _align(title_offset + len(title_bytes))
+    stamps_offset = values_offset + 8 * count
+    names_offset = stamps_offset + 8 * count
+    order_offset = names_offset + 8 * (count + 1)
+    kinds_offset = order_offset + 4 * count
+    strings_offset = kinds_offset + count
+
+    name_offsets = array("Q", [strings_offset])
+    position = strings_offset
+    for data in encoded:
+        position += len(data)
+        name_offsets.append(position)
+
+    header = _HEADER.pack(MAGIC, VERSION, count, title_offset, len(title_bytes), values_offset,
+                          stamps_offset, kinds_offset, names_offset, order_offset, strings_offset)
+    return b"".join([
+        header,
+        title_bytes,
+        bytes(values_offset - title_offset - len(title_bytes)),
+        _column_bytes(values),
+        _column_bytes(stamps),
+        _column_bytes(name_offsets),
+        _column_bytes(order),
+        bytes(kinds),
+        b"".join(encoded),
+    ])
+
+
+class ColumnarTally:
+    """An open, memory-mapped columnar tally file.
+
+    Rows are numbered in file order. Opening costs the same whatever the size
+    of the file; entries are only decoded when asked for.
+    """
+
+    def __init__(self, file_path: str, writable: bool = False):
+        self.path = file_path
+        self._file = open(file_path, "r+b" if writable else "rb")
+        try:
+            access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+            self._map = mmap.mmap(self._file.fileno(), 0, access=access)
+        except (ValueError, OSError):
+            self._file.close()
+            raise ValueError(f"Not a tally file: {file_path}")
+
+        try:
+            self._read_header()
+        except ValueError:
+            self.close()
+            raise
+
+    def _read_header(self):
+        if len(self._map) < _HEADER.size:
+            raise ValueError(f"Not a tally file: {self.path}")
+        (magic, version, self._count, self._title_offset, self._title_length, self._values,
+         self._stamps, self._kinds, self._names, self._order,
+         strings) = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a tally file: {self.path}")
+        if version != VERSION:
+            raise ValueError(f"Unsupported tally file version {version}: {self.path}")
+        count = self._count
+        size = len(self._map)
+        sections = (self._values + 8 * count, self._stamps + 8 * count,
+                    self._names + 8 * (count + 1), self._order + 4 * count, self._kinds + count,
+                    strings, self._title_offset + self._title_length)
+        if max(sections) > size or _OFFSET.unpack_from(self._map, self._names + 8 * count)[0] > size:
+            raise ValueError(f"Tally file is truncated: {self.path}")
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def title(self) -> str:
+        start = self._title_offset
+        return _decode_name(self._map[start:start + self._title_length])
+
+    # Point access
+
+    def name(self, row: int) -> str:
+        start, end = struct.unpack_from("<2Q", self._map, self._names + 8 * row)
+        return _decode_name(self._map[start:end])
+
+    def value(self, row: int) -> int:
+        return _VALUE.unpack_from(self._map, self._values + 8 * row)[0]
+
+    def last_updated(self, row: int):
+        stamp = _STAMP.unpack_from(self._map, self._stamps + 8 * row)[0]
+        return int(stamp) if self._map[self._kinds + row] == _INT_STAMP else stamp
+
+    def entry(self, row: int) -> Dict:
+        return {"name": self.name(row), "value": self.value(row),
+                "last_updated": self.last_updated(row)}
+
+    def find(self, name: str) -> Optional[int]:
+        """Row of the entry with this name, or None; a binary search over the name order"""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            row = _ROW.unpack_from(self._map, self._order + 4 * middle)[0]
+            current = self.name(row)
+            if current == name:
+                return row
+            if current < name:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def get(self, name: str) -> Optional[Dict]:
+        row = self.find(name)
+        return None if row is None else self.entry(row)
+
+    def set_entry(self, row: int, value: int, last_updated) -> None:
+        """Overwrite an entry's value and timestamp in place"""
+        if not 0 <= row < self._count:
+            raise IndexError(row)
+        kind = _stamp_kind(last_updated, self.name(row))
+        try:
+            _VALUE.pack_into(self._map, self._values + 8 * row, value)
+        except struct.error:
+            raise ValueError(f"Value does not fit in 64 bits: {value}")
+        _STAMP.pack_into(self._map, self._stamps + 8 * row, last_updated)
+        self._map[self._kinds + row] = kind
+
+    def flush(self) -> None:
+        """Write in-place changes through to the file"""
+        self._map.flush()
+
+    # Bulk access
+
+    def _column(self, typecode: str, offset: int, length: int) -> array:
+        column = array(typecode)
+        column.frombytes(self._map[offset:offset + column.itemsize * length])
+        if _BIG_ENDIAN:
+            column.byteswap()
+        return column
+
+    def entries(self) -> List[Dict]:
+        """Decode every entry, in file order"""
+        count = self._count
+        values = self._column("q", self._values, count).tolist()
+        stamps = self._column("d", self._stamps, count).tolist()
+        offsets = self._column("Q", self._names, count + 1).tolist()
+        kinds = self._map[self._kinds:self._kinds + count]
+        strings_start = offsets[0]
+        strings = self._map[strings_start:offsets[-1]]
+        if kinds.count(_INT_STAMP):
+            stamps = [int(stamp) if kind == _INT_STAMP else stamp
+                      for stamp, kind in zip(stamps, kinds)]
+
+        text = _decode_name(strings)
+        if len(text) == len(strings):
+            # Pure ASCII, so byte offsets are also character offsets
+            names = [text[start - strings_start:end - strings_start]
+                     for start, end in zip(offsets, offsets[1:])]
+        else:
+            names = [_decode_name(strings[start - strings_start:end - strings_start])
+                     for start, end in zip(offsets, offsets[1:])]
+
+        return [{"name": name, "value": value, "last_updated": stamp}
+                for name, value, stamp in zip(names, values, stamps)]
+
+    # Rank queries; ties on value and timestamp are the only names decoded
+
+    def _rank_columns(self):
+        count = self._count
+        return (self._column("q", self._values, count).tolist(),
+                self._column("d", self._stamps, count).tolist())
+
+    def top(self, count: int, offset: int = 0) -> List[Dict]:
+        """Entries ranked offset + 1 to offset + count"""
+        values, stamps = self._rank_columns()
+        wanted = offset + count
+        if wanted <= 0 or not values:
+            return []
+        picked = heapq.nsmallest(wanted, zip([-value for value in values], stamps, range(self._count)))
+        # Rows that share the last picked value and timestamp rank by name
+        last_value, last_stamp = -picked[-1][0], picked[-1][1]
+        rows = [row for negated, stamp, row in picked
+                if (-negated, stamp) != (last_value, last_stamp)]
+        rows += [row for row, value in enumerate(values)
+                 if value == last_value and stamps[row] == last_stamp]
+        entries = sorted((self.entry(row) for row in rows),
+                         key=lambda entry: (-entry["value"], entry["last_updated"], entry["name"]))
+        return entries[offset:wanted]
+
+    def rank_of(self, name: str) -> Optional[int]:
+        """1-based rank of an entry, or None; counts the entries ahead of it"""
+        row = self.find(name)
+        if row is None:
+            return None
+        values, stamps = self._rank_columns()
+        value, stamp = values[row], stamps[row]
+        ahead = sum(1 for other in values if other > value)
+        for other, other_value in enumerate(values):
+            if other_value == value and (stamps[other] < stamp or (
+                    stamps[other] == stamp and self.name(other) < name)):
+                ahead += 1
+        return ahead + 1
+
+
+def read_tally(file_path: str) -> Dict:
+    """Read a columnar tally file into the same shape as a JSON tally file"""
+    with ColumnarTally(file_path) as tally:
+        return {"title": tally.title, "entries": tally.entries()}
+
+
+def update_tally(file_path: str, title: str, entries: Iterable[Dict],
+                 changed: Iterable[str]) -> bool:
+    """Write the changed entries' values and timestamps in place.
+
+    Returns False without touching the file if it is not a readable tally
+    file or anything else differs from what is on disk (title, entry count,
+    or a changed name the file does not have yet); the caller then rewrites
+    the whole file. Entries that cannot be stored raise ValueError before
+    any row is written.
+    """
+    changed = set(changed)
+    entries = list(entries)
+    try:
+        tally = ColumnarTally(file_path, writable=True)
+    except ValueError:
+        return False
+    with tally:
+        if len(tally) != len(entries) or tally.title != title:
+            return False
+        updates = []
+        for entry in entries:
+            name = entry["name"]
+            if name not in changed:
+                continue
+            row = tally.find(name)
+            if row is None:
+                return False
+            _check_value(entry["value"], name)
+            _stamp_kind(entry["last_updated"], name)
+            updates.append((row, entry["value"], entry["last_updated"]))
+        for row, value, last_updated in updates:
+            tally.set_entry(row, value, last_updated)
+        tally.flush()
+    return True
@@ -1,16 +1,112 @@
 #!/usr/bin/env python3
 
 import json
-import jsonschema
 import os
-from typing import Dict, List, Optional
+import stat
+import tempfile
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from core import columnar, journal, perf, sqlite_store, streaming
+from core.file_watcher import file_signature
+
+# Journals larger than this are folded back into the JSON snapshot on Update
+DEFAULT_COMPACT_BYTES = 256 * 1024
+
+# The simple tally shape the fast validation path understands
+_ENTRY_TYPES = {"name": "string", "value": "integer", "last_updated": "number"}
+_TOP_LEVEL_TYPES = {"title": "string", "entries": "array"}
+
+
+def _is_simple_object(schema: Dict, types: Dict[str, str]) -> bool:
+    """Check a schema is a closed object whose properties only constrain type"""
+    properties = schema.get("properties", {})
+    return (schema.get("type") == "object"
+            and schema.get("additionalProperties") is False
+            and sorted(schema.get("required", [])) == sorted(types)
+            and set(schema) <= {"$schema", "type", "title", "description", "properties",
+                                "required", "additionalProperties"}
+            and properties.keys() == types.keys()
+            and all(properties[key].get("type") == kind
+                    and set(properties[key]) <= {"type", "description", "items"}
+                    for key, kind in types.items()))
+
+
+def _supports_fast_path(schema: Dict) -> bool:
+    """Whether the schema is exactly the simple tally shape"""
+    try:
+        items = schema["properties"]["entries"]["items"]
+        return (_is_simple_object(schema, _TOP_LEVEL_TYPES)
+                and set(schema["properties"]["entries"]) <= {"type", "description", "items"}
+                and _is_simple_object(items, _ENTRY_TYPES))
+    except (KeyError, TypeError, AttributeError):
+        return False
+
+
+def _is_valid_entry(entry) -> bool:
+    """Structural check of one entry; a subset of what the schema accepts"""
+    return (type(entry) is dict and len(entry) == 3
+            and type(entry.get("name")) is str
+            and type(entry.get("value")) is int
+            and type(entry.get("last_updated")) in (float, int))
+
+
+def write_atomically(file_path: str, write: Callable, binary: bool = False) -> Tuple[int, int, int]:
+    """Write a file via a synced temp file that is renamed over the target,
+    so readers and crashes only ever see the old or the new contents.
+    Returns the (mtime, size, inode) of what was written."""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+    
+    try:
+        mode = stat.S_IMODE(os.stat(file_path).st_mode)
+    except OSError:
+        mode = 0o644
+    
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(file_path)}.",
+                                     suffix=".tmp")
+    try:
+        with (os.fdopen(fd, 'wb') if binary else os.fdopen(fd, 'w', encoding='utf-8')) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+            # Renaming keeps these, and unlike a stat() afterwards they cannot
+            # belong to someone else's write
+            written = os.fstat(f.fileno())
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    
+    # Make the rename itself durable where the platform allows syncing directories
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    
+    return (written.st_mtime_ns, written.st_size, written.st_ino)
 
 
 class DataManager:
-    def __init__(self, schema_path: str):
-        """Initialize the data manager with schema validation"""
+    def __init__(self, schema_path: str, compact_bytes: int = DEFAULT_COMPACT_BYTES,
+                 parse_cache=None):
+        """Initialize the data manager with schema validation
+        
+        `parse_cache` (a parse_cache.ParseCache) lets unchanged JSON files load
+        without parsing or validating them again.
+        """
         self.schema_path = schema_path
         self.schema = self._load_schema()
+        self._validator = None
+        self._fast_path = _supports_fast_path(self.schema)
+        self.compact_bytes = compact_bytes
+        self.parse_cache = parse_cache
+        self._journals: Dict[str, journal.Journal] = {}
         
     def _load_schema(self) -> Dict:
         """Load the JSON schema for validation"""
@@ -20,21 +116,202 @@ class DataManager:
         except Exception as e:
             raise RuntimeError(f"Failed to load schema: {e}")
     
-    def validate_data(self, data: Dict) -> bool:
-        """Validate data against the schema"""
-        try:
-            jsonschema.validate(data, self.schema)
+    def _get_validator(self):
+        """Compile the schema validator once and reuse it"""
+        if self._validator is None:
+            # Imported lazily: well-formed data never needs jsonschema at all
+            import jsonschema
+            validator_class = jsonschema.validators.validator_for(self.schema)
+            validator_class.check_schema(self.schema)
+            self._validator = validator_class(self.schema)
+        return self._validator
+    
+    def _passes_fast_path(self, data, changed) -> bool:
+        """Cheap structural check that only accepts data the schema accepts"""
+        if not self._fast_path:
+            return False
+        if not (type(data) is dict and len(data) == 2
+                and type(data.get("title")) is str and type(data.get("entries")) is list):
+            return False
+        
+        entries = data["entries"]
+        if changed is None:
+            return all(map(_is_valid_entry, entries))
+        
+        changed = set(changed)
+        if not changed:
             return True
-        except jsonschema.exceptions.ValidationError as e:
-            raise ValueError(f"Data validation failed: {e.message}")
+        return all(_is_valid_entry(entry) for entry in entries
+                   if type(entry) is not dict or entry.get("name") in changed)
+    
+    @perf.timed
+    def validate_data(self, data: Dict, changed: Optional[Iterable[str]] = None) -> bool:
+        """Validate data against the schema
+        
+        `changed` optionally names the entries modified since the last successful
+        validation; the other entries are trusted and not re-checked.
+        """
+        try:
+            if self._passes_fast_path(data, changed):
+                perf.count("validate_data.fast_path")
+                return True
+            perf.count("validate_data.schema")
+            
+            # Anything the fast path does not recognise goes through the full schema,
+            # so the accepted set and the error messages stay exactly the same
+            validator = self._get_validator()
+            from jsonschema.exceptions import best_match
+            error = best_match(validator.iter_errors(data))
         except Exception as e:
             raise ValueError(f"Validation error: {e}")
+        
+        if error is not None:
+            raise ValueError(f"Data validation failed: {error.message}")
+        return True
     
-    def load_file(self, file_path: str) -> Dict:
-        """Load and validate a tally data file"""
+    @perf.timed
+    def load_file(self, file_path: str, replay_journal: bool = True) -> Dict:
+        """Load and validate a tally data file
+        
+        With `replay_journal` False only the snapshot is read, leaving out
+        changes journaled since it was written.
+        """
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
         
+        if columnar.is_columnar_path(file_path):
+            data = self._read_columnar(file_path)
+            self.validate_data(data)
+        elif sqlite_store.is_sqlite_path(file_path):
+            data = self._read_sqlite(file_path)
+            self.validate_data(data)
+        else:
+            data = self._read_json(file_path)
+        
+        # Replay any journaled changes made since the last snapshot
+        records = list(journal.read_records(file_path)) if replay_journal else []
+        if records:
+            journal.replay(data, records)
+            self.validate_data(data)
+        
+        return data
+    
+    @perf.timed
+    def load_file_streaming(self, file_path: str,
+                            on_entry: Optional[Callable[[Dict], None]] = None,
+                            progress: Optional[Callable[[int, int], None]] = None,
+                            chunk_size: int = streaming.DEFAULT_CHUNK_SIZE) -> Dict:
+        """Load and validate a tally data file one entry at a time
+        
+        Each validated entry is passed to `on_entry` as soon as it is parsed instead
+        of being collected into the returned data. `progress` is called with
+        (bytes_read, total_bytes) after every chunk.
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        # Schemas the fast path does not understand need the whole document, and
+        # columnar files and databases are read in one go without parsing
+        # anyway; so are files whose validated parse is cached
+        has_journal = os.path.exists(journal.journal_path(file_path))
+        data = None if has_journal else self._cached_parse(file_path)
+        if data is None and (not self._fast_path or has_journal
+                             or columnar.is_columnar_path(file_path)
+                             or sqlite_store.is_sqlite_path(file_path)):
+            data = self.load_file(file_path)
+        if data is not None:
+            if on_entry is not None:
+                for entry in data["entries"]:
+                    on_entry(entry)
+                data["entries"] = []
+            return data
+        
+        total_bytes = os.path.getsize(file_path)
+        report = progress and (lambda bytes_read: progress(bytes_read, total_bytes))
+        top_level = {}
+        entries = []
+        try:
+            with open(file_path, 'rb') as f:
+                for kind, key, value in streaming.iter_tally(f, chunk_size, report):
+                    if kind == "field":
+                        top_level[key] = value
+                    elif kind == "entries":
+                        top_level[key] = []
+                    else:
+                        # Entries the fast check rejects get the schema's exact error
+                        if not _is_valid_entry(value):
+                            self.validate_data({"title": "", "entries": [value]})
+                        if on_entry is not None:
+                            on_entry(value)
+                        else:
+                            entries.append(value)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to read file: {e}")
+        
+        # Entries were checked as they arrived, so only the top level is left
+        self.validate_data(top_level)
+        top_level["entries"] = entries
+        return top_level
+    
+    @perf.timed
+    def save_file(self, file_path: str, title: str, entries: List[Dict],
+                  changed: Optional[Iterable[str]] = None) -> Optional[Tuple]:
+        """Save tally data to file with validation; returns the file's signature
+        as written, like write_atomically
+        
+        `changed` is passed on to validate_data so only modified entries are re-checked.
+        Columnar (.tally) files get the changed entries written in place when nothing
+        else differs; databases (.sqlite) get them written in one transaction.
+        While the file has a journal, everything is checked and written: journaled
+        changes are already out of the callers' changed sets.
+        """
+        if changed is not None and os.path.exists(journal.journal_path(file_path)):
+            changed = None
+        
+        data = {
+            "title": title,
+            "entries": entries
+        }
+        
+        # Validate before saving
+        self.validate_data(data, changed)
+        
+        if columnar.is_columnar_path(file_path):
+            signature = self._save_columnar(file_path, title, entries, changed)
+        elif sqlite_store.is_sqlite_path(file_path):
+            signature = self._save_sqlite(file_path, title, entries, changed)
+        else:
+            try:
+                signature = write_atomically(
+                    file_path, lambda f: json.dump(data, f, indent=2, ensure_ascii=False))
+            except Exception as e:
+                raise RuntimeError(f"Failed to save file: {e}")
+            # The next load of what was just written needs no parsing at all
+            if self.parse_cache is not None:
+                self.parse_cache.put(file_path, signature, self.schema, data)
+        
+        # The snapshot now contains every journaled change
+        self._get_journal(file_path).discard()
+        return signature
+    
+    def _cached_parse(self, file_path: str) -> Optional[Dict]:
+        # A database can change in its write-ahead log without its own mtime changing
+        if (self.parse_cache is None or columnar.is_columnar_path(file_path)
+                or sqlite_store.is_sqlite_path(file_path)):
+            return None
+        data = self.parse_cache.get(file_path, self.schema)
+        perf.count("parse_cache.hit" if data is not None else "parse_cache.miss")
+        return data
+    
+    def _read_json(self, file_path: str) -> Dict:
+        """Parse and validate a JSON snapshot, or take it from the parse cache"""
+        data = self._cached_parse(file_path)
+        if data is not None:
+            return data
+        
+        signature = file_signature(file_path)
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
@@ -46,24 +323,91 @@ class DataManager:
         # Validate against schema
         self.validate_data(data)
         
+        # Only cache what was read if the file did not change while reading it
+        if self.parse_cache is not None and file_signature(file_path) == signature:
+            self.parse_cache.put(file_path, signature, self.schema, data)
         return data
     
-    def save_file(self, file_path: str, title: str, entries: List[Dict]) -> None:
-        """Save tally data to file with validation"""
-        data = {
-            "title": title,
-            "entries": entries
-        }
+    def _read_columnar(self, file_path: str) -> Dict:
+        try:
+            return columnar.read_tally(file_path)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to read file: {e}")
+    
+    def _save_columnar(self, file_path: str, title: str, entries: List[Dict],
+                       changed: Optional[Iterable[str]]) -> Optional[Tuple]:
+        """Write changed entries in place when possible, else rewrite the file"""
+        # Encoding errors (values beyond 64 bits) are data errors, so they stay ValueErrors
+        if changed is not None and os.path.exists(file_path):
+            try:
+                if columnar.update_tally(file_path, title, entries, changed):
+                    return file_signature(file_path)
+            except ValueError:
+                raise
+            except Exception as e:
+                raise RuntimeError(f"Failed to save file: {e}")
+        contents = columnar.encode_tally(title, entries)
+        try:
+            return write_atomically(file_path, lambda f: f.write(contents), binary=True)
+        except Exception as e:
+            raise RuntimeError(f"Failed to save file: {e}")
+    
+    def _read_sqlite(self, file_path: str) -> Dict:
+        try:
+            return sqlite_store.read_tally(file_path)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to read file: {e}")
+    
+    def _save_sqlite(self, file_path: str, title: str, entries: List[Dict],
+                     changed: Optional[Iterable[str]]) -> Optional[Tuple]:
+        """Write just the changed entries when possible, else replace every row"""
+        try:
+            if changed is None or not os.path.exists(file_path) or not sqlite_store.update_tally(
+                    file_path, title, entries, changed):
+                sqlite_store.write_tally(file_path, title, entries)
+            return file_signature(file_path)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to save file: {e}")
+    
+    def _get_journal(self, file_path: str) -> journal.Journal:
+        key = os.path.abspath(file_path)
+        if key not in self._journals:
+            self._journals[key] = journal.Journal(file_path)
+        return self._journals[key]
+    
+    def append_journal(self, file_path: str, record: List) -> None:
+        """Append one mutation record to the file's journal"""
+        try:
+            self._get_journal(file_path).append(record)
+        except Exception as e:
+            raise RuntimeError(f"Failed to write journal: {e}")
+    
+    def checkpoint(self, file_path: str, title: str, entries: List[Dict],
+                   changed: Optional[Iterable[str]] = None) -> Optional[Tuple]:
+        """Make journaled changes durable, compacting once the journal is large.
         
-        # Validate before saving
-        self.validate_data(data)
+        Returns the file's new signature if the journal was folded back into
+        the snapshot, else None.
+        """
+        log = self._get_journal(file_path)
+        if log.size() >= self.compact_bytes:
+            return self.save_file(file_path, title, entries, changed)
         
         try:
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            log.sync()
         except Exception as e:
-            raise RuntimeError(f"Failed to save file: {e}")
+            raise RuntimeError(f"Failed to sync journal: {e}")
+        return None
+    
+    def close_journal(self, file_path: str) -> None:
+        """Close the journal handle for a file that is no longer open"""
+        log = self._journals.pop(os.path.abspath(file_path), None)
+        if log is not None:
+            log.close()
     
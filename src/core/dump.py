@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+
+from typing import Dict, Iterable, Iterator, Optional, TextIO, Tuple
+
+from core import perf
+from core.entry_store import Entry
+
+
+def position_change_indicator(previous_position: Optional[int], current_position: int) -> str:
+    """Get the position change indicator for an entry; None means it is new"""
+    if previous_position is None:
+        return "🌱 -"  # New entry
+
+    if current_position < previous_position:  # Position improved (lower number = better rank)
+        change = previous_position - current_position
+        return f"⬆️+{change}"
+    elif current_position > previous_position:  # Position declined
+        change = current_position - previous_position
+        return f"⬇️-{change}"
+    else:  # Position stayed the same
+        return "⚪ ="
+
+
+def value_change_text(previous_value: Optional[int], current_value: int) -> str:
+    """Get the value change text for an entry; None means it is new"""
+    if previous_value is None:
+        return ""  # New entry, no change to display
+
+    value_change = current_value - previous_value
+
+    if value_change > 0:
+        return f" (+{value_change})"
+    elif value_change < 0:
+        return f" ({value_change})"
+    else:
+        return ""  # No change, don't display anything
+
+
+def format_dump_line(rank: int, name: str, value: int,
+                     previous_rank: Optional[int], previous_value: Optional[int]) -> str:
+    """Format one entry of the simple dump"""
+    change_indicator = position_change_indicator(previous_rank, rank)
+    change_text = value_change_text(previous_value, value)
+    return f"{rank:2d} {change_indicator} {name:<20} {value:3d} points{change_text}"
+
+
+@perf.timed
+def format_simple_dump(title: str, ranked_entries: Iterable[Entry], baseline=None) -> str:
+    """Generate a human-readable dump of entries given in rank order.
+
+    Changes are shown against `baseline` (a history.Baseline); without one
+    every entry is shown as new.
+    """
+    lines = [title, "=" * len(title), ""]
+
+    for rank, entry in enumerate(ranked_entries, 1):
+        name = entry.name
+        if baseline is None:
+            previous_rank = previous_value = None
+        else:
+            previous_rank = baseline.previous_rank(name, rank)
+            previous_value = baseline.previous_value(name)
+        lines.append(format_dump_line(rank, name, entry.value, previous_rank, previous_value))
+
+    if len(lines) == 3:
+        return f"{title}\n(No entries)"
+    return "\n".join(lines)
+
+
+class DumpRenderer:
+    """Renders the simple dump lazily, one line at a time.
+
+    Formatted lines are cached per entry with the rank they were built at.
+    The renderer follows the ranking and drops an entry's line when the entry
+    changes, and drops every line when it is given another baseline; any
+    other line only needs a new rank to be re-formatted, since the baseline
+    state behind it is fixed. Re-dumping after a few clicks reuses almost
+    every line without looking anything up in the baseline.
+    """
+
+    def __init__(self, ranking):
+        self._ranking = ranking
+        self._cache: Dict[str, Tuple[int, str]] = {}
+        self._baseline = None
+        ranking.add_observer(self._on_change)
+
+    @property
+    def ranking(self):
+        return self._ranking
+
+    def _on_change(self, old_name, new_name, old_key):
+        if old_name is None and new_name is None:
+            self._cache.clear()
+            return
+        self._cache.pop(old_name, None)
+        self._cache.pop(new_name, None)
+
+    def detach(self):
+        """Stop following the ranking"""
+        self._ranking.remove_observer(self._on_change)
+
+    def clear(self) -> None:
+        """Drop every cached line, e.g. to free memory"""
+        self._cache.clear()
+
+    def _line(self, rank: int, entry: Entry, baseline) -> str:
+        name = entry.name
+        cached = self._cache.get(name)
+        if cached is not None and cached[0] == rank:
+            return cached[1]
+
+        if baseline is None:
+            previous_rank = previous_value = None
+        else:
+            previous_rank = baseline.previous_rank(name, rank)
+            previous_value = baseline.previous_value(name)
+        line = format_dump_line(rank, name, entry.value, previous_rank, previous_value)
+        self._cache[name] = (rank, line)
+        return line
+
+    def _selected(self, baseline, top: Optional[int], ranks: Optional[Tuple[int, int]],
+                  changed_only: bool) -> Iterator[Tuple[int, Entry]]:
+        """(rank, entry) pairs passing the filters, in rank order"""
+        ranking = self._ranking
+        first, last = ranks if ranks else (1, len(ranking))
+        if top is not None:
+            last = min(last, top)
+
+        if not changed_only:
+            for rank, entry in enumerate(ranking.window(first - 1, last), first):
+                yield rank, entry
+            return
+
+        # Only entries touched since the baseline can be new or have new values
+        if baseline is None:
+            return
+        touched = sorted((ranking.rank_of(name), name) for name in baseline.changed_names())
+        for rank, name in touched:
+            if rank < first or rank > last:
+                continue
+            entry = ranking.get(name)
+            if (baseline.previous_rank(name, rank) != rank
+                    or baseline.previous_value(name) != entry.value):
+                yield rank, entry
+
+    def iter_lines(self, title: str, baseline=None, top: Optional[int] = None,
+                   ranks: Optional[Tuple[int, int]] = None,
+                   changed_only: bool = False) -> Iterator[str]:
+        """Yield the dump line by line.
+
+        `top` keeps the first N ranks, `ranks` is an inclusive 1-based range and
+        `changed_only` keeps entries that are new or moved or changed value
+        since `baseline`.
+        """
+        if baseline is not self._baseline:
+            # Every line compares against the baseline
+            self._cache.clear()
+            self._baseline = baseline
+
+        if not len(self._ranking):
+            yield title
+            yield "(No entries)"
+            return
+
+        yield title
+        yield "=" * len(title)
+        yield ""
+
+        empty = True
+        for rank, entry in self._selected(baseline, top, ranks, changed_only):
+            empty = False
+            yield self._line(rank, entry, baseline)
+
+        if empty:
+            yield "(No entries)"
+
+    @perf.timed
+    def render(self, title: str, baseline=None, **filters) -> str:
+        """Render the whole dump as one string, e.g. for the clipboard"""
+        return "\n".join(self.iter_lines(title, baseline, **filters))
+
+    @perf.timed
+    def write(self, stream: TextIO, title: str, baseline=None, **filters) -> None:
+        """Write the dump to a text stream without building it in memory"""
+        for line in self.iter_lines(title, baseline, **filters):
+            stream.write(line)
+            stream.write("\n")
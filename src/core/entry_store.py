@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+from typing import Dict, Iterable, List
+
+
+class Entry:
+    """One tally entry: a fixed-layout record instead of a three-key dict.
+
+    __slots__ drops the per-instance dict, which is most of the memory a dict
+    entry costs. Reading fields as attributes also avoids hashing the key on
+    every sort-key evaluation. entry["name"] style reads still work for code
+    written against plain dicts; convert with to_dict() for saving.
+    """
+
+    __slots__ = ("name", "value", "last_updated")
+
+    def __init__(self, name: str, value: int, last_updated: float):
+        self.name = name
+        self.value = value
+        self.last_updated = last_updated
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Entry":
+        return cls(data["name"], data["value"], data["last_updated"])
+
+    def to_dict(self) -> Dict:
+        """The entry in the JSON file shape"""
+        return {"name": self.name, "value": self.value, "last_updated": self.last_updated}
+
+    def __getitem__(self, key: str):
+        if key not in Entry.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Entry):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+    __hash__ = None  # Mutable, like the dicts it replaces
+
+    def __repr__(self) -> str:
+        return f"Entry({self.name!r}, {self.value!r}, {self.last_updated!r})"
+
+
+def to_dicts(entries: Iterable[Entry]) -> List[Dict]:
+    """Convert entries to the list of dicts DataManager.save_file expects"""
+    return [entry.to_dict() for entry in entries]
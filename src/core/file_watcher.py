@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+import hashlib
+import os
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from core.ranking import Ranking
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def file_digest(file_path: str) -> Optional[bytes]:
+    """Content hash of a file, or None if it cannot be read"""
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.digest()
+
+
+def file_signature(file_path: str) -> Optional[Tuple]:
+    """(mtime, size, inode) of a file, or None if it is missing"""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class FileWatcher:
+    """Notices when a file is changed by someone else.
+
+    Checking costs one stat() while the file's mtime, size and inode stay
+    the same. Only when they move is the file hashed, and then only inside
+    check(): a file touched or re-synced with the contents of an earlier
+    check is not reported again. The file is never parsed.
+    """
+
+    def __init__(self, file_path: str, signature: Optional[Tuple] = None):
+        self.path = file_path
+        self.acknowledge(signature or file_signature(file_path))
+
+    @property
+    def signature(self) -> Optional[Tuple]:
+        """(mtime, size, inode) of the file when its contents were last accepted"""
+        return self._signature_seen
+
+    def acknowledge(self, signature: Optional[Tuple]) -> None:
+        """Accept the file as it was at `signature`, e.g. as returned by our
+        own save; a later write by someone else still counts as a change"""
+        self._signature_seen = signature
+        self._digest_seen = None  # Not hashed until the signature moves
+
+    def invalidate(self) -> None:
+        """Forget the accepted state so the next check reports the file again,
+        e.g. after it changed but could not be read yet"""
+        self._signature_seen = None
+        self._digest_seen = None
+
+    def check(self) -> bool:
+        """Whether the contents changed since the last check or acknowledge()"""
+        signature = file_signature(self.path)
+        if signature is None or signature == self._signature_seen:
+            return False
+        digest = file_digest(self.path)
+        self._signature_seen = signature
+        if digest == self._digest_seen:
+            return False
+        self._digest_seen = digest
+        return True
+
+
+class MergePlan(NamedTuple):
+    """Entry changes that bring a ranking up to date with a newer file"""
+    added: List[Dict]                      # entries only the file has
+    updated: List[Tuple[str, int, float]]  # (name, value, last_updated) the file has newer
+    removed: List[str]                     # names the file no longer has
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.updated) + len(self.removed)
+
+
+def plan_merge(ranking: Ranking, file_entries: Iterable[Dict], synced) -> MergePlan:
+    """Work out how to merge a changed file into the in-memory ranking.
+
+    `synced` is a history.Baseline of the file as last loaded or saved, so
+    local changes since then can be told apart from changes in the file:
+
+    - an entry in both takes the file's version unless it also changed here,
+      in which case the later last_updated wins
+    - an entry only in the file is added, unless it was renamed or removed here
+    - an entry missing from the file is removed, unless it was changed here
+    """
+    added, updated = [], []
+    departed = synced.departed_names()
+    seen = set()
+    for entry in file_entries:
+        name = entry["name"]
+        seen.add(name)
+        local = ranking.get(name)
+        if local is None:
+            if name not in departed:
+                added.append(entry)
+        elif (entry["value"], entry["last_updated"]) != (local.value, local.last_updated):
+            # Unchanged here, the file wins; changed on both sides, the later change wins
+            if not synced.has_changed(name) or entry["last_updated"] > local.last_updated:
+                updated.append((name, entry["value"], entry["last_updated"]))
+
+    removed = [entry.name for entry in ranking
+               if entry.name not in seen and not synced.has_changed(entry.name)]
+    return MergePlan(added, updated, removed)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from core.entry_store import Entry
+from core.ranking import Ranking
+
+# Standard baseline labels used by the window
+LAST_UPDATE = "Last update"
+SINCE_OPENED = "Since opened"
+
+
+class Baseline:
+    """The state of a ranking at some earlier point, stored as a delta.
+
+    Only entries touched since the baseline was taken are recorded, each with
+    its sort key at that time (None for entries added since). Everything else
+    is shared with the live ranking, so a baseline costs nothing until entries
+    change and rank/value deltas cost O(log n) per entry.
+    """
+
+    def __init__(self, ranking: Ranking, label: str):
+        self.label = label
+        self._ranking = ranking
+        self._before: Dict[str, Optional[Tuple]] = {}
+        self._orphaned: List[Tuple] = []  # keys at baseline of entries no longer reachable by name
+        self._old_keys: Optional[List[Tuple]] = None
+        self._current_keys: Optional[List[Tuple]] = None
+
+    def _record(self, old_name: Optional[str], new_name: Optional[str],
+                old_key: Optional[Tuple]) -> None:
+        """Remember an entry's baseline state the first time it changes"""
+        self._old_keys = None
+        self._current_keys = None
+
+        if old_name is None:
+            # New entry; a removed entry re-added under its old name keeps its history
+            self._before.setdefault(new_name, None)
+        elif new_name is None or new_name == old_name:
+            self._before.setdefault(old_name, old_key)
+        else:
+            before = self._before.pop(old_name, old_key)
+            displaced = self._before.get(new_name)
+            if displaced is not None:
+                self._orphaned.append(displaced)
+            self._before[new_name] = before
+
+    def _prepare(self):
+        """Sort the baseline and current keys of the changed entries"""
+        if self._old_keys is None:
+            self._old_keys = sorted(
+                [key for key in self._before.values() if key is not None] + self._orphaned)
+            ranking = self._ranking
+            self._current_keys = sorted(
+                ranking.sort_key(ranking.get(name)) for name in self._before if name in ranking)
+        return self._old_keys, self._current_keys
+
+    def _count_ahead_at_baseline(self, key: Tuple, current_rank: Optional[int]) -> int:
+        """Number of entries that sorted before `key` at baseline time"""
+        old_keys, current_keys = self._prepare()
+        ahead_now = (current_rank - 1 if current_rank is not None
+                     else self._ranking.count_ahead(key))
+        # Swap the changed entries' current keys for their baseline keys
+        return ahead_now - bisect_left(current_keys, key) + bisect_left(old_keys, key)
+
+    # Queries
+
+    def is_new(self, name: str) -> bool:
+        """Whether the entry did not exist at baseline time"""
+        return name in self._before and self._before[name] is None
+
+    def previous_rank(self, name: str, current_rank: Optional[int] = None) -> Optional[int]:
+        """1-based rank the entry had at baseline time, or None if it is new.
+
+        Passing the entry's current rank, when already known, saves a lookup.
+        """
+        if name in self._before:
+            key = self._before[name]
+            if key is None:
+                return None
+            return self._count_ahead_at_baseline(key, None) + 1
+
+        # Untouched entries still have their baseline key
+        key = self._ranking.sort_key(self._ranking.get(name))
+        return self._count_ahead_at_baseline(key, current_rank) + 1
+
+    def previous_value(self, name: str) -> Optional[int]:
+        """Value the entry had at baseline time, or None if it is new"""
+        if name in self._before:
+            key = self._before[name]
+            return None if key is None else -key[0]
+        entry = self._ranking.get(name)
+        return None if entry is None else entry.value
+
+    def has_changed(self, name: str) -> bool:
+        """Whether the entry may differ from the baseline, including being new"""
+        return name in self._before
+
+    def departed_names(self) -> Set[str]:
+        """Names entries had at baseline time that no present entry has any more,
+        i.e. entries renamed or removed since"""
+        keys = [key for key in self._before.values() if key is not None] + self._orphaned
+        return {key[2] for key in keys if key[2] not in self._ranking}
+
+    def changed_names(self) -> List[str]:
+        """Names of present entries whose value or timestamp may differ from the baseline"""
+        return [name for name in self._before if name in self._ranking]
+
+    def changes(self) -> Dict[str, Tuple[Optional[int], Optional[int]]]:
+        """Rank and value deltas of every changed entry, as name -> (rank delta,
+        value delta). Rank deltas are positive for moving up; both are None for
+        new entries. Costs O(k log n) for k changed entries."""
+        result = {}
+        for name in self.changed_names():
+            previous_rank = self.previous_rank(name)
+            if previous_rank is None:
+                result[name] = (None, None)
+                continue
+            result[name] = (previous_rank - self._ranking.rank_of(name),
+                            self._ranking.get(name).value - self.previous_value(name))
+        return result
+
+
+class History:
+    """Named baselines over one ranking, kept up to date as it changes"""
+
+    def __init__(self, ranking: Ranking):
+        self._ranking = ranking
+        self._baselines: Dict[str, Baseline] = {}
+        ranking.add_observer(self._on_change)
+
+    @property
+    def ranking(self) -> Ranking:
+        return self._ranking
+
+    def _on_change(self, old_name, new_name, old_key):
+        if old_name is None and new_name is None:
+            # The ranking was reloaded wholesale; earlier states are gone
+            for label in list(self._baselines):
+                self.mark(label)
+            return
+        for baseline in self._baselines.values():
+            baseline._record(old_name, new_name, old_key)
+
+    def detach(self):
+        """Stop following the ranking"""
+        self._ranking.remove_observer(self._on_change)
+
+    def mark(self, label: str) -> Baseline:
+        """Take a baseline of the current state, replacing any with the same label"""
+        baseline = Baseline(self._ranking, label)
+        self._baselines[label] = baseline
+        return baseline
+
+    def mark_from_entries(self, label: str, entries: Iterable[Dict]) -> Baseline:
+        """Take a baseline from another state of the same list, e.g. an older file.
+
+        Costs one pass over both states; afterwards it is maintained like any other.
+        """
+        baseline = Baseline(self._ranking, label)
+        ranking = self._ranking
+        seen = set()
+        for entry in entries:
+            name = entry["name"]
+            seen.add(name)
+            current = ranking.get(name)
+            if (current is None or current.value != entry["value"]
+                    or current.last_updated != entry["last_updated"]):
+                baseline._before[name] = ranking.sort_key(Entry.from_dict(entry))
+        for entry in ranking:
+            if entry.name not in seen:
+                baseline._before[entry.name] = None
+        self._baselines[label] = baseline
+        return baseline
+
+    def rename(self, label: str, new_label: str) -> None:
+        """Move a baseline to another label, replacing any already there"""
+        baseline = self._baselines.pop(label)
+        baseline.label = new_label
+        self._baselines[new_label] = baseline
+
+    def get(self, label: str) -> Optional[Baseline]:
+        return self._baselines.get(label)
+
+    def discard(self, label: str) -> None:
+        self._baselines.pop(label, None)
+
+    def labels(self) -> List[str]:
+        return list(self._baselines)
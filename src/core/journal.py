@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+import json
+import os
+from typing import Dict, Iterator, List
+
+JOURNAL_SUFFIX = ".journal"
+
+# Record types, stored as the first element of each record
+TITLE = "t"      # ["t", title]
+ADD = "a"        # ["a", name, value, last_updated]
+RENAME = "r"     # ["r", old_name, new_name]
+DELTA = "d"      # ["d", name, delta, last_updated]
+REMOVE = "x"     # ["x", name]
+
+
+def journal_path(file_path: str) -> str:
+    """Get the sidecar journal path for a tally file"""
+    return file_path + JOURNAL_SUFFIX
+
+
+class Journal:
+    """Append-only log of mutations stored next to a tally file.
+
+    Each mutation is one compact JSON array per line. Lines are flushed as they
+    are written so a crash loses at most the record being written.
+    """
+
+    def __init__(self, file_path: str):
+        self.path = journal_path(file_path)
+        self._file = None
+
+    def append(self, record: List) -> None:
+        """Append one record to the journal"""
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n")
+        self._file.flush()
+
+    def sync(self) -> None:
+        """Force appended records to disk"""
+        if self._file is not None:
+            os.fsync(self._file.fileno())
+
+    def size(self) -> int:
+        """Size of the journal in bytes"""
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def discard(self) -> None:
+        """Delete the journal once its records are folded into the snapshot"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def read_records(file_path: str) -> Iterator[List]:
+    """Read the journal records for a tally file, oldest first"""
+    path = journal_path(file_path)
+    if not os.path.exists(path):
+        return
+
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.read().split("\n")
+
+    for number, line in enumerate(lines, 1):
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            # A torn final line is a write that never completed
+            if number == len(lines):
+                return
+            raise ValueError(f"Corrupt journal record on line {number}")
+        if not isinstance(record, list) or not record:
+            raise ValueError(f"Corrupt journal record on line {number}")
+        yield record
+
+
+def replay(data: Dict, records) -> Dict:
+    """Apply journal records on top of a loaded snapshot, in place"""
+    entries = data["entries"]
+    by_name = {entry["name"]: entry for entry in entries}
+
+    for record in records:
+        kind = record[0]
+        try:
+            if kind == TITLE:
+                data["title"] = record[1]
+            elif kind == ADD:
+                _, name, value, last_updated = record
+                entry = {"name": name, "value": value, "last_updated": last_updated}
+                entries.append(entry)
+                by_name[name] = entry
+            elif kind == RENAME:
+                _, old_name, new_name = record
+                entry = by_name.pop(old_name)
+                entry["name"] = new_name
+                by_name[new_name] = entry
+            elif kind == DELTA:
+                _, name, delta, last_updated = record
+                entry = by_name[name]
+                entry["value"] += delta
+                entry["last_updated"] = last_updated
+            elif kind == REMOVE:
+                _, name = record
+                entries.remove(by_name.pop(name))
+            else:
+                raise ValueError(f"Unknown journal record type: {kind!r}")
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Cannot replay journal record {record!r}: {e}")
+
+    return data
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Sum many tally files into one, e.g. event nights into season totals.
+
+Each worker process loads and validates its share of the files with its own
+DataManager and folds them into one partial total per name, so only those
+partials cross process boundaries and the work splits evenly across cores.
+
+An entry's merged last_updated is when its total was reached: the latest
+time among the files where it scored, as the final night that changed its
+total is the one that completed it. Entries that never scored keep the
+earliest time they appear with, so ties still go to whoever was there first.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core import perf
+from core.data_manager import DataManager
+
+# name -> (total, latest time it scored or None, earliest time it appears)
+Partial = Dict[str, Tuple[int, Optional[float], float]]
+
+# Tasks handed out per worker; more than one evens out files of different sizes
+CHUNKS_PER_WORKER = 4
+
+_worker_manager: Optional[DataManager] = None
+
+
+def _init_worker(schema_path: str):
+    # One DataManager per process, so the schema is read once per worker
+    global _worker_manager
+    _worker_manager = DataManager(schema_path)
+
+
+def _add_entries(partial: Partial, entries: Iterable[Dict]) -> None:
+    for entry in entries:
+        name, value, stamp = entry["name"], entry["value"], entry["last_updated"]
+        known = partial.get(name)
+        if known is None:
+            partial[name] = (value, stamp if value else None, stamp)
+            continue
+        total, reached, first = known
+        if value and (reached is None or stamp > reached):
+            reached = stamp
+        partial[name] = (total + value, reached, min(first, stamp))
+
+
+def _merge_chunk(file_paths: Sequence[str]) -> Partial:
+    """Load the given files and total them into one partial"""
+    partial: Partial = {}
+    for file_path in file_paths:
+        try:
+            data = _worker_manager.load_file(file_path)
+        except ValueError as e:
+            raise ValueError(f"{file_path}: {e}")
+        _add_entries(partial, data["entries"])
+    return partial
+
+
+def combine(partials: Iterable[Partial]) -> Partial:
+    """Fold partial totals into one"""
+    result: Partial = {}
+    for partial in partials:
+        if not result:
+            result = partial
+            continue
+        for name, (total, reached, first) in partial.items():
+            known = result.get(name)
+            if known is None:
+                result[name] = (total, reached, first)
+                continue
+            known_total, known_reached, known_first = known
+            if reached is None or (known_reached is not None and known_reached >= reached):
+                reached = known_reached
+            result[name] = (known_total + total, reached, min(known_first, first))
+    return result
+
+
+def _chunks(file_paths: Sequence[str], count: int) -> List[List[str]]:
+    """Split the files into `count` lists of about the same total size"""
+    def size(path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0  # Loading it will report the problem
+
+    sizes = {path: size(path) for path in file_paths}
+    chunks: List[List[str]] = [[] for _ in range(count)]
+    loads = [0] * count
+    for path in sorted(file_paths, key=sizes.get, reverse=True):
+        lightest = loads.index(min(loads))
+        chunks[lightest].append(path)
+        loads[lightest] += sizes[path]
+    return [chunk for chunk in chunks if chunk]
+
+
+@perf.timed
+def merge_files(schema_path: str, file_paths: Sequence[str],
+                workers: Optional[int] = None) -> List[Dict]:
+    """Load every file and return the summed entries in rank order.
+
+    Files are spread over `workers` processes (one per CPU by default); with
+    one worker or one file everything runs in this process.
+    """
+    if not file_paths:
+        raise ValueError("No files to merge")
+    workers = min(workers or os.cpu_count() or 1, len(file_paths))
+    if workers <= 1:
+        _init_worker(schema_path)
+        totals = _merge_chunk(file_paths)
+    else:
+        chunks = _chunks(file_paths, min(len(file_paths), workers * CHUNKS_PER_WORKER))
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(schema_path,)) as pool:
+            totals = combine(pool.map(_merge_chunk, chunks))
+
+    entries = [{"name": name, "value": total,
+                "last_updated": reached if reached is not None else first}
+               for name, (total, reached, first) in totals.items()]
+    entries.sort(key=lambda entry: (-entry["value"], entry["last_updated"], entry["name"]))
+    return entries
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+import heapq
+from typing import Iterator, List, Optional, Tuple
+
+# The blocked sorted list already gives O(log n) inserts and position lookups
+from core.ranking import Ranking, _SortedKeys
+
+# Sorts after any character a name can continue with
+_AFTER_ALL = "\U0010ffff"
+
+
+def _fold(name: str) -> str:
+    return name.casefold()
+
+
+class NameIndex:
+    """Case-insensitive prefix index over the names in a ranking.
+
+    Names are kept sorted as (casefolded name, name) keys and follow the
+    ranking through its observer hook, so adds, renames and removals update
+    the index in O(log n) without rebuilding it. Finding where the matches of
+    a prefix start and end is two bisects, whether the ranking holds a
+    hundred names or a million.
+    """
+
+    def __init__(self, ranking: Ranking):
+        self._ranking = ranking
+        self._keys = _SortedKeys()
+        self._rebuild()
+        ranking.add_observer(self._on_change)
+
+    def _rebuild(self):
+        self._keys = _SortedKeys((_fold(name), name) for name in self._ranking.names())
+
+    def _on_change(self, old_name: Optional[str], new_name: Optional[str], old_key):
+        if old_name == new_name:
+            if old_name is None:
+                self._rebuild()  # The whole ranking was reloaded
+            return  # Only the score changed
+        if old_name is not None:
+            self._keys.remove((_fold(old_name), old_name))
+        if new_name is not None:
+            self._keys.add((_fold(new_name), new_name))
+
+    @property
+    def ranking(self) -> Ranking:
+        return self._ranking
+
+    def detach(self):
+        """Stop following the ranking"""
+        self._ranking.remove_observer(self._on_change)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _span(self, prefix: str) -> Tuple[str, int, int]:
+        """The folded prefix and the positions of the first and after the last match"""
+        folded = _fold(prefix)
+        return (folded, self._keys.count_less((folded,)),
+                self._keys.count_less((folded + _AFTER_ALL,)))
+
+    def count(self, prefix: str) -> int:
+        """How many names start with `prefix`, in O(log n)"""
+        _, start, stop = self._span(prefix)
+        return stop - start
+
+    def names_with_prefix(self, prefix: str) -> Iterator[str]:
+        """Names starting with `prefix`, ignoring case, in alphabetical order"""
+        _, start, stop = self._span(prefix)
+        for key in self._keys.islice(start, stop):
+            yield key[1]
+
+    def matches(self, prefix: str, limit: Optional[int] = None) -> Tuple[List[str], int]:
+        """Names starting with `prefix` in rank order, at most `limit` of them,
+        and how many matched in total.
+
+        Few matches are looked up by name and sorted by rank. When so many
+        names match that the best `limit` of them are near the top anyway,
+        the ranking is walked from the top instead; either way the work
+        tracks the smaller of the two, not the size of the ranking.
+        """
+        folded, start, stop = self._span(prefix)
+        total = stop - start
+        ranking = self._ranking
+        if limit is not None and limit < total and limit * len(ranking) < total * total:
+            # About limit * n / total entries to look at before finding enough
+            found = []
+            for entry in ranking:
+                if _fold(entry.name).startswith(folded):
+                    found.append(entry.name)
+                    if len(found) == limit:
+                        break
+            return found, total
+
+        names = [key[1] for key in self._keys.islice(start, stop)]
+        sort_key = lambda name: Ranking.sort_key(ranking.get(name))
+        if limit is not None and limit < total:
+            return heapq.nsmallest(limit, names, key=sort_key), total
+        return sorted(names, key=sort_key), total
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Undo/redo history of the mutations made to a board.
+
+Each mutation is kept as a small record holding just enough to apply it in
+either direction, never a copy of the board, and undoing sets the exact
+value and last_updated an entry had before so ties rank as they did. A step
+is one user action and may hold several records, e.g. an import; the records
+of one step always touch different entries.
+"""
+
+from collections import deque
+from typing import List, Optional, Sequence, Tuple
+
+from core.ranking import Ranking
+
+# Record types, stored as the first element of each record
+ADD = "add"          # ("add", name, value, last_updated)
+REMOVE = "remove"    # ("remove", name, value, last_updated)
+SET = "set"          # ("set", name, old_value, old_last_updated, new_value, new_last_updated)
+RENAME = "rename"    # ("rename", old_name, new_name)
+TITLE = "title"      # ("title", old_title, new_title)
+
+# Records kept for undo; the oldest steps are dropped beyond this
+DEFAULT_LIMIT = 10_000
+
+
+def inverse(record: Tuple) -> Tuple:
+    """The record that undoes `record`"""
+    kind = record[0]
+    if kind == ADD:
+        return (REMOVE,) + record[1:]
+    if kind == REMOVE:
+        return (ADD,) + record[1:]
+    if kind == SET:
+        _, name, old_value, old_last_updated, new_value, new_last_updated = record
+        return (SET, name, new_value, new_last_updated, old_value, old_last_updated)
+    if kind in (RENAME, TITLE):
+        return (kind, record[2], record[1])
+    raise ValueError(f"Unknown record type: {kind!r}")
+
+
+def applies_to(record: Tuple, ranking: Ranking, title: str) -> bool:
+    """Whether the board is in the state `record` starts from, i.e. nothing
+    else changed the entry or title since"""
+    kind = record[0]
+    if kind == ADD:
+        return record[1] not in ranking
+    if kind in (REMOVE, SET):
+        entry = ranking.get(record[1])
+        return entry is not None and (entry.value, entry.last_updated) == (record[2], record[3])
+    if kind == RENAME:
+        return record[1] in ranking and record[2] not in ranking
+    if kind == TITLE:
+        return title == record[1]
+    return False
+
+
+class OpLog:
+    """Bounded undo and redo stacks of steps.
+
+    At most `limit` records are kept; recording past that drops the oldest
+    steps, so memory stays flat however long the session runs. Recording a
+    new step clears the redo stack.
+    """
+
+    def __init__(self, limit: int = DEFAULT_LIMIT):
+        self.limit = limit
+        self._undo: deque = deque()
+        self._redo: List[Tuple[Tuple, ...]] = []
+        self._size = 0   # records in both stacks
+
+    def __len__(self) -> int:
+        return len(self._undo)
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def clear(self) -> None:
+        self._undo.clear()
+        self._redo.clear()
+        self._size = 0
+
+    def record(self, *records: Tuple) -> None:
+        """Remember one user action made of the given records"""
+        if not records:
+            return
+        self._size -= sum(len(step) for step in self._redo)
+        self._redo.clear()
+        if len(records) > self.limit:
+            # Too big to keep; what came before cannot be undone past it either
+            self.clear()
+            return
+        self._undo.append(tuple(records))
+        self._size += len(records)
+        while self._size > self.limit:
+            self._size -= len(self._undo.popleft())
+
+    def peek_undo(self) -> Optional[Sequence[Tuple]]:
+        """The records that undo the last step, in the order to apply them"""
+        if not self._undo:
+            return None
+        return [inverse(record) for record in reversed(self._undo[-1])]
+
+    def peek_redo(self) -> Optional[Sequence[Tuple]]:
+        """The records that redo the last undone step"""
+        return self._redo[-1] if self._redo else None
+
+    def undone(self) -> None:
+        """Move the last step to the redo stack once its undo was applied"""
+        self._redo.append(self._undo.pop())
+
+    def redone(self) -> None:
+        """Move the last undone step back once it was applied again"""
+        self._undo.append(self._redo.pop())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Validated parses of JSON tally files, reused while the file is unchanged.
+
+A file is looked up by its path, (mtime, size, inode) and the schema it was
+validated against. Hits come back in marshal format, which loads several
+times faster than JSON and skips validation entirely; anything that does not
+match exactly is a miss and the file is parsed as usual. The cache is only a
+shortcut, so failing to read or write it is never an error.
+"""
+
+import hashlib
+import json
+import marshal
+import os
+import struct
+import sys
+from typing import Dict, Optional, Tuple
+
+from core.data_manager import write_atomically
+from core.file_watcher import file_signature
+
+CACHE_VERSION = 1
+# Cached files beyond this many are removed, least recently written first
+MAX_CACHED_FILES = 16
+_SUFFIX = ".parse"
+_KEY_LENGTH = struct.Struct("<I")
+
+
+class ParseCache:
+    def __init__(self, directory: str, max_files: int = MAX_CACHED_FILES):
+        self.directory = directory
+        self.max_files = max_files
+
+    def _cache_path(self, file_path: str) -> str:
+        digest = hashlib.blake2b(os.path.abspath(file_path).encode("utf-8"), digest_size=16)
+        return os.path.join(self.directory, digest.hexdigest() + _SUFFIX)
+
+    @staticmethod
+    def _key(file_path: str, signature: Tuple, schema: Dict) -> list:
+        schema_digest = hashlib.blake2b(json.dumps(schema, sort_keys=True).encode("utf-8"),
+                                        digest_size=16).hexdigest()
+        return [CACHE_VERSION, marshal.version, list(sys.version_info[:2]),
+                os.path.abspath(file_path), list(signature), schema_digest]
+
+    def get(self, file_path: str, schema: Dict) -> Optional[Dict]:
+        """The cached data of a file if it has not changed since it was cached"""
+        signature = file_signature(file_path)
+        if signature is None:
+            return None
+        try:
+            with open(self._cache_path(file_path), 'rb') as f:
+                # The key is stored first so a stale entry costs one small read;
+                # marshal.load() on the file itself would read byte by byte
+                length, = _KEY_LENGTH.unpack(f.read(_KEY_LENGTH.size))
+                if marshal.loads(f.read(length)) != self._key(file_path, signature, schema):
+                    return None
+                data = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError, struct.error):
+            return None
+        return data if isinstance(data, dict) else None
+
+    def put(self, file_path: str, signature: Optional[Tuple], schema: Dict, data: Dict) -> None:
+        """Remember validated data for the file as it was at `signature`"""
+        if signature is None:
+            return
+        key = self._key(file_path, signature, schema)
+        try:
+            key_bytes = marshal.dumps(key)
+            contents = _KEY_LENGTH.pack(len(key_bytes)) + key_bytes + marshal.dumps(data)
+        except ValueError:
+            return  # Not marshallable, e.g. an unexpected type; just don't cache it
+        try:
+            write_atomically(self._cache_path(file_path), lambda f: f.write(contents), binary=True)
+            self._prune()
+        except OSError:
+            pass
+
+    def discard(self, file_path: str) -> None:
+        try:
+            os.remove(self._cache_path(file_path))
+        except OSError:
+            pass
+
+    def _prune(self) -> None:
+        cached = []
+        for name in os.listdir(self.directory):
+            if name.endswith(_SUFFIX):
+                path = os.path.join(self.directory, name)
+                try:
+                    cached.append((os.stat(path).st_mtime_ns, path))
+                except OSError:
+                    pass
+        cached.sort()
+        for _, path in cached[:max(0, len(cached) - self.max_files)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Opt-in timings and counters for finding out where the time goes.
+
+Functions decorated with @timed and calls to count() record nothing until
+enable() is called (or TALLY_PERF=1 is set); until then each call costs one
+global lookup and a branch. When enabled, every call keeps its latency for
+stats() and an event for write_trace(), which writes the Chrome trace event
+format that chrome://tracing and https://ui.perfetto.dev open.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+# Latencies kept per name for percentiles
+RECENT_SAMPLES = 1000
+# Trace events kept in total; the oldest are dropped first
+TRACE_EVENTS = 100_000
+
+_enabled = os.environ.get("TALLY_PERF", "") not in ("", "0")
+_lock = threading.Lock()
+_recent: Dict[str, deque] = {}
+_totals: Dict[str, List] = {}       # name -> [calls, total seconds, max seconds]
+_counters: Dict[str, int] = {}
+_trace: deque = deque(maxlen=TRACE_EVENTS)
+_origin = time.perf_counter()
+
+
+def enable(on: bool = True) -> None:
+    global _enabled
+    _enabled = on
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    """Forget everything recorded so far"""
+    with _lock:
+        _recent.clear()
+        _totals.clear()
+        _counters.clear()
+        _trace.clear()
+
+
+def _record(name: str, start: float, elapsed: float) -> None:
+    with _lock:
+        recent = _recent.get(name)
+        if recent is None:
+            recent = _recent[name] = deque(maxlen=RECENT_SAMPLES)
+            _totals[name] = [0, 0.0, 0.0]
+        recent.append(elapsed)
+        totals = _totals[name]
+        totals[0] += 1
+        totals[1] += elapsed
+        totals[2] = max(totals[2], elapsed)
+        _trace.append({"name": name, "ph": "X", "pid": os.getpid(),
+                       "tid": threading.get_ident(),
+                       "ts": (start - _origin) * 1e6, "dur": elapsed * 1e6})
+
+
+def timed(func: Optional[Callable] = None, *, name: Optional[str] = None) -> Callable:
+    """Decorator recording the latency of every call while timing is enabled.
+
+    Use as @timed or @timed(name="..."); the name defaults to the qualified
+    function name, e.g. "DataManager.load_file".
+    """
+    if func is None:
+        return lambda f: timed(f, name=name)
+    label = name or func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _record(label, start, time.perf_counter() - start)
+
+    return wrapper
+
+
+def count(name: str, n: int = 1) -> None:
+    """Add to a named counter while timing is enabled"""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def stats() -> Dict[str, Dict]:
+    """Per timed name: calls, total, last, max and p50/p90/p99 of recent calls (seconds)"""
+    with _lock:
+        snapshot = {name: (list(recent), list(_totals[name])) for name, recent in _recent.items()}
+    result = {}
+    for name, (recent, (calls, total, longest)) in snapshot.items():
+        ordered = sorted(recent)
+        result[name] = {
+            "calls": calls,
+            "total": total,
+            "last": recent[-1],
+            "max": longest,
+            "p50": _percentile(ordered, 0.50),
+            "p90": _percentile(ordered, 0.90),
+            "p99": _percentile(ordered, 0.99),
+        }
+    return result
+
+
+def counters() -> Dict[str, int]:
+    with _lock:
+        return dict(_counters)
+
+
+def write_trace(file_path: str) -> int:
+    """Write recorded calls as a Chrome trace file; returns the number of events"""
+    with _lock:
+        events = list(_trace)
+        totals = dict(_counters)
+    now = (time.perf_counter() - _origin) * 1e6
+    events += [{"name": name, "ph": "C", "pid": os.getpid(), "ts": now, "args": {"count": value}}
+               for name, value in totals.items()]
+    try:
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    except OSError as e:
+        raise RuntimeError(f"Failed to write trace: {e}")
+    return len(events)
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+
+import time
+from bisect import bisect_left, insort
+from typing import (Callable, Dict, FrozenSet, Iterable, Iterator, KeysView, List, Optional, Set,
+                    Tuple, Union)
+
+from core.entry_store import Entry, to_dicts
+
+# Target number of keys per block in the sorted key list. Blocks are split
+# once they grow past twice this size.
+_LOAD = 512
+
+
+class _SortedKeys:
+    """Sorted list of unique keys stored as a list of sorted blocks.
+
+    A Fenwick tree over the block lengths gives O(log n) positional lookups,
+    so inserting, removing and finding the position of a key never touches
+    more than one block plus the tree.
+    """
+
+    def __init__(self, keys: Iterable = ()):
+        keys = sorted(keys)
+        self._lists = [keys[i:i + _LOAD] for i in range(0, len(keys), _LOAD)]
+        self._maxes = [block[-1] for block in self._lists]
+        self._len = len(keys)
+        self._tree: Optional[List[int]] = None
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator:
+        for block in self._lists:
+            yield from block
+
+    # Fenwick tree over block lengths
+
+    def _build_tree(self) -> List[int]:
+        tree = [0] + [len(block) for block in self._lists]
+        size = len(tree)
+        for i in range(1, size):
+            parent = i + (i & -i)
+            if parent < size:
+                tree[parent] += tree[i]
+        self._tree = tree
+        return tree
+
+    def _tree_add(self, pos: int, delta: int):
+        tree = self._tree
+        i = pos + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, pos: int) -> int:
+        """Number of keys stored in the blocks before block `pos`"""
+        tree = self._tree or self._build_tree()
+        total = 0
+        i = pos
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, index: int) -> Tuple[int, int]:
+        """Map a flat index to (block, offset within block)"""
+        tree = self._tree or self._build_tree()
+        pos = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(tree) and tree[nxt] <= index:
+                index -= tree[nxt]
+                pos = nxt
+            step >>= 1
+        return pos, index
+
+    # Mutation
+
+    def add(self, key):
+        if not self._maxes:
+            self._lists.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            self._tree = None
+            return
+
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._maxes):
+            pos -= 1
+            self._lists[pos].append(key)
+            self._maxes[pos] = key
+        else:
+            insort(self._lists[pos], key)
+        self._len += 1
+
+        block = self._lists[pos]
+        if len(block) > 2 * _LOAD:
+            self._lists.insert(pos + 1, block[_LOAD:])
+            del block[_LOAD:]
+            self._maxes.insert(pos, block[-1])
+            self._tree = None
+        elif self._tree is not None:
+            self._tree_add(pos, 1)
+
+    def remove(self, key):
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._maxes):
+            raise KeyError(key)
+        block = self._lists[pos]
+        i = bisect_left(block, key)
+        if i == len(block) or block[i] != key:
+            raise KeyError(key)
+
+        del block[i]
+        self._len -= 1
+        if not block:
+            del self._lists[pos]
+            del self._maxes[pos]
+            self._tree = None
+        else:
+            self._maxes[pos] = block[-1]
+            if self._tree is not None:
+                self._tree_add(pos, -1)
+
+    # Queries
+
+    def count_less(self, key) -> int:
+        """Number of stored keys strictly less than `key`"""
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._maxes):
+            return self._len
+        return self._prefix(pos) + bisect_left(self._lists[pos], key)
+
+    def __getitem__(self, index: int):
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("index out of range")
+        pos, offset = self._locate(index)
+        return self._lists[pos][offset]
+
+    def islice(self, start: int, stop: int) -> Iterator:
+        """Iterate over the keys at flat positions [start, stop)"""
+        start = max(start, 0)
+        stop = min(stop, self._len)
+        if start >= stop:
+            return
+        pos, offset = self._locate(start)
+        remaining = stop - start
+        while remaining > 0:
+            chunk = self._lists[pos][offset:offset + remaining]
+            yield from chunk
+            remaining -= len(chunk)
+            pos += 1
+            offset = 0
+
+
+class Ranking:
+    """The entries of a tally list, kept in rank order.
+
+    Entries are ranked by value (descending) and then by the time they reached
+    that value (ascending), so there are never ties. A hash index by name plus
+    an incrementally maintained sort order make mutations, rank lookups and
+    rank-window queries O(log n) instead of a full re-sort.
+
+    Entries are stored as compact Entry records (see entry_store); the ones
+    returned from this class are owned by the ranking and must only be changed
+    through its methods. Plain dicts are accepted wherever entries go in.
+
+    Observers are called as observer(old_name, new_name, old_key) just before
+    an entry changes: old_name is None for a new entry, new_name is None for a
+    removed one, and old_key is the entry's sort key before the change. After
+    load() replaces everything they are called once with (None, None, None).
+    """
+
+    def __init__(self, entries: Optional[Iterable[Dict]] = None):
+        self._entries: Dict[str, Entry] = {}
+        self._order = _SortedKeys()
+        self._changed: Set[str] = set()
+        self._observers: List[Callable] = []
+        if entries is not None:
+            self.load(entries)
+
+    @staticmethod
+    def _key(entry: Entry) -> Tuple:
+        # The name makes keys unique when value and timestamp are identical
+        return (-entry.value, entry.last_updated, entry.name)
+
+    # Public name for the sort key: lower keys rank higher
+    sort_key = _key
+
+    def add_observer(self, observer: Callable) -> None:
+        self._observers.append(observer)
+
+    def remove_observer(self, observer: Callable) -> None:
+        self._observers.remove(observer)
+
+    def _notify(self, old_name: Optional[str], new_name: Optional[str],
+                old_key: Optional[Tuple]) -> None:
+        for observer in self._observers:
+            observer(old_name, new_name, old_key)
+
+    def load(self, entries: Iterable[Union[Entry, Dict]]) -> None:
+        """Replace all entries, sorting them once"""
+        by_name = {}
+        for data in entries:
+            entry = Entry.from_dict(data)
+            if entry.name in by_name:
+                raise ValueError(f"Duplicate entry name: {entry.name}")
+            by_name[entry.name] = entry
+        self._entries = by_name
+        self._order = _SortedKeys(self._key(entry) for entry in by_name.values())
+        self._changed = set()
+        self._notify(None, None, None)
+
+    # Lookups
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def __iter__(self) -> Iterator[Entry]:
+        """Iterate over entries in rank order"""
+        entries = self._entries
+        for key in self._order:
+            yield entries[key[2]]
+
+    def names(self) -> KeysView[str]:
+        """All entry names in no particular order, cheaper than iterating in rank order"""
+        return self._entries.keys()
+
+    def get(self, name: str) -> Optional[Entry]:
+        """Get an entry by name, or None if it does not exist"""
+        return self._entries.get(name)
+
+    def count_ahead(self, key: Tuple) -> int:
+        """Number of entries that sort before the given sort key"""
+        return self._order.count_less(key)
+
+    def rank_of(self, name: str) -> int:
+        """Get the 1-based rank of an entry"""
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(name)
+        return self._order.count_less(self._key(entry)) + 1
+
+    def row_for(self, name: str, value: int, last_updated: float,
+                new_name: Optional[str] = None) -> int:
+        """Get the 0-based row an entry would occupy after being added or changed"""
+        new_key = (-value, last_updated, name if new_name is None else new_name)
+        row = self._order.count_less(new_key)
+        entry = self._entries.get(name)
+        # An existing entry is still counted if it currently sorts first
+        if entry is not None and self._key(entry) < new_key:
+            row -= 1
+        return row
+
+    def entry_at(self, row: int) -> Entry:
+        """Get the entry at a 0-based row in rank order"""
+        return self._entries[self._order[row][2]]
+
+    def window(self, start: int, stop: int) -> List[Entry]:
+        """Get the entries at 0-based rows [start, stop) in rank order"""
+        entries = self._entries
+        return [entries[key[2]] for key in self._order.islice(start, stop)]
+
+    def changed_names(self) -> FrozenSet[str]:
+        """Names of entries added or modified since the last clear_changes()"""
+        return frozenset(self._changed)
+
+    def clear_changes(self) -> None:
+        """Forget tracked changes, e.g. once they have been validated and saved"""
+        self._changed.clear()
+
+    def to_list(self) -> List[Dict]:
+        """Get all entries as plain dicts in rank order, ready to be saved"""
+        return to_dicts(self)
+
+    # Mutations
+
+    def add(self, name: str, value: int = 0, last_updated: Optional[float] = None) -> Entry:
+        """Add a new entry"""
+        if name in self._entries:
+            raise ValueError(f"Entry '{name}' already exists")
+        entry = Entry(name, value, time.time() if last_updated is None else last_updated)
+        self._notify(None, name, None)
+        self._entries[name] = entry
+        self._order.add(self._key(entry))
+        self._changed.add(name)
+        return entry
+
+    def insert(self, entry: Union[Entry, Dict]) -> None:
+        """Insert an already validated entry as loaded, without marking it changed"""
+        entry = Entry.from_dict(entry)
+        if entry.name in self._entries:
+            raise ValueError(f"Duplicate entry name: {entry.name}")
+        self._notify(None, entry.name, None)
+        self._entries[entry.name] = entry
+        self._order.add(self._key(entry))
+
+    def remove(self, name: str) -> Entry:
+        """Remove an entry and return it"""
+        entry = self._entries[name]
+        self._notify(name, None, self._key(entry))
+        del self._entries[name]
+        self._order.remove(self._key(entry))
+        self._changed.discard(name)
+        return entry
+
+    def rename(self, old_name: str, new_name: str) -> Entry:
+        """Rename an entry, keeping its value and timestamp"""
+        entry = self._entries[old_name]
+        if new_name == old_name:
+            return entry
+        if new_name in self._entries:
+            raise ValueError(f"Entry '{new_name}' already exists")
+        self._notify(old_name, new_name, self._key(entry))
+        self._order.remove(self._key(entry))
+        del self._entries[old_name]
+        entry.name = new_name
+        self._entries[new_name] = entry
+        self._order.add(self._key(entry))
+        self._changed.discard(old_name)
+        self._changed.add(new_name)
+        return entry
+
+    def set_value(self, name: str, value: int, last_updated: float) -> Entry:
+        """Set an entry's value and timestamp exactly"""
+        entry = self._entries[name]
+        self._notify(name, name, self._key(entry))
+        self._order.remove(self._key(entry))
+        entry.value = value
+        entry.last_updated = last_updated
+        self._order.add(self._key(entry))
+        self._changed.add(name)
+        return entry
+
+    def apply_bulk(self, changes: Dict[str, Tuple[int, float]]) -> List[str]:
+        """Apply many (delta, last_updated) changes by name with a single re-rank.
+
+        Missing names are added starting from 0. Returns the names that were added.
+        """
+        added = []
+        for name, (delta, last_updated) in changes.items():
+            entry = self._entries.get(name)
+            if entry is None:
+                self._notify(None, name, None)
+                entry = Entry(name, 0, last_updated)
+                self._entries[name] = entry
+                added.append(name)
+            else:
+                self._notify(name, name, self._key(entry))
+            entry.value += delta
+            entry.last_updated = last_updated
+            self._changed.add(name)
+
+        if changes:
+            self._order = _SortedKeys(self._key(entry) for entry in self._entries.values())
+        return added
+
+    def adjust(self, name: str, delta: int, timestamp: Optional[float] = None) -> Entry:
+        """Change an entry's value by `delta`, stamping the time it was reached"""
+        entry = self._entries[name]
+        return self.set_value(name, entry.value + delta,
+                              time.time() if timestamp is None else timestamp)
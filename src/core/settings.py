@@ -2,7 +2,7 @@
 
 import json
 import os
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings:
@@ -22,7 +22,11 @@ class Settings:
         
         # Default settings
         return {
-            "last_file": None
+            "last_file": None,
+            "journal_mode": False,
+            "server_url": "http://127.0.0.1:8765",
+            "open_files": [],
+            "workspace_memory_mb": 256
         }
     
     def _save_settings(self):
@@ -41,4 +45,35 @@ class Settings:
     def set_last_file(self, file_path: Optional[str]):
         """Set the last opened file path"""
         self.settings["last_file"] = file_path
-        self._save_settings()
\ No newline at end of file
+        self._save_settings()
+    
+    def get_journal_mode(self) -> bool:
+        """Whether changes are journaled as they happen instead of saved on Update"""
+        return bool(self.settings.get("journal_mode", False))
+    
+    def set_journal_mode(self, enabled: bool):
+        """Turn journal mode on or off"""
+        self.settings["journal_mode"] = enabled
+        self._save_settings()
+    
+    def get_server_url(self) -> str:
+        """Address of the scoring server the window last attached to"""
+        return self.settings.get("server_url") or "http://127.0.0.1:8765"
+    
+    def set_server_url(self, url: str):
+        """Remember the scoring server address"""
+        self.settings["server_url"] = url
+        self._save_settings()
+    
+    def get_open_files(self) -> List[str]:
+        """Files open in the workspace, in the order they were opened"""
+        return list(self.settings.get("open_files") or [])
+    
+    def set_open_files(self, file_paths: List[str]):
+        """Remember the files open in the workspace"""
+        self.settings["open_files"] = list(file_paths)
+        self._save_settings()
+    
+    def get_workspace_memory_limit(self) -> int:
+        """Memory the workspace may use for boards that are not shown, in bytes"""
+        return int(self.settings.get("workspace_memory_mb", 256)) * 1024 * 1024
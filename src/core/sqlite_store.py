@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""SQLite tally databases (*.sqlite).
+
+Same logical content as a JSON tally file, for boards that are saved all day:
+
+    meta     key/value pairs; holds the title
+    entries  one row per entry; row numbers keep the file order
+
+A unique index on name enforces the no-duplicates rule, and an index on
+(value DESC, last_updated ASC, name ASC) holds the entries in rank order, so
+the top of the board and the rank of a name are read straight from it
+without loading anything else. Every write is one transaction in WAL mode,
+so saving a few changed scores only writes those rows and readers never see
+half a save.
+
+last_updated has no column type, so integer and float timestamps come back
+as the type they were stored as and JSON -> sqlite -> JSON is exact.
+"""
+
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import quote
+
+SUFFIX = ".sqlite"
+# Marks a database as a tally file ("TLLY"), next to the schema version
+APPLICATION_ID = 0x544C4C59
+VERSION = 1
+
+_SCHEMA = (
+    "CREATE TABLE meta (key TEXT PRIMARY KEY, value) WITHOUT ROWID",
+    "CREATE TABLE entries (row INTEGER PRIMARY KEY, name TEXT NOT NULL,"
+    " value INTEGER NOT NULL, last_updated NOT NULL)",
+    "CREATE UNIQUE INDEX entries_by_name ON entries (name)",
+    "CREATE INDEX entries_by_rank ON entries (value DESC, last_updated ASC, name ASC)",
+)
+_RANK_ORDER = "ORDER BY value DESC, last_updated ASC, name ASC"
+_UPSERT = ("INSERT INTO entries (row, name, value, last_updated) "
+           "VALUES ((SELECT IFNULL(MAX(row), -1) + 1 FROM entries), ?, ?, ?) "
+           "ON CONFLICT (name) DO UPDATE SET value = excluded.value, "
+           "last_updated = excluded.last_updated")
+
+
+def is_sqlite_path(file_path: str) -> bool:
+    """Whether a path names a SQLite tally database"""
+    return file_path.lower().endswith(SUFFIX)
+
+
+def _entry_dicts(rows) -> List[Dict]:
+    return [{"name": name, "value": value, "last_updated": last_updated}
+            for name, value, last_updated in rows]
+
+
+# What SQLite or the sqlite3 module raise for entries they cannot store
+_STORE_ERRORS = (sqlite3.IntegrityError, OverflowError, UnicodeEncodeError)
+
+
+def _explain(entries: List[Dict], error: Exception) -> ValueError:
+    """Name the entry that could not be stored"""
+    seen = set()
+    for entry in entries:
+        name, value, last_updated = entry["name"], entry["value"], entry["last_updated"]
+        if name in seen:
+            return ValueError(f"Duplicate entry name: '{name}'")
+        seen.add(name)
+        try:
+            name.encode("utf-8")
+        except UnicodeEncodeError:
+            return ValueError(f"Name cannot be stored in a database: {name!r}")
+        if not -2 ** 63 <= value < 2 ** 63:
+            return ValueError(f"Value of '{name}' does not fit in 64 bits: {value}")
+        if last_updated != last_updated:
+            return ValueError(f"Timestamp of '{name}' cannot be stored: {last_updated}")
+    return ValueError(f"Cannot store entries: {error}")
+
+
+class SqliteTally:
+    """An open tally database.
+
+    Opening an existing database reads nothing but its header; a writable
+    handle on an empty or missing file creates the tables.
+    """
+
+    def __init__(self, file_path: str, writable: bool = False):
+        self.path = file_path
+        if not writable and not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        mode = "rwc" if writable else "rw"
+        # Autocommit mode; every write begins its own transaction
+        self._db = sqlite3.connect(f"file:{quote(os.path.abspath(file_path))}?mode={mode}",
+                                   uri=True, isolation_level=None)
+        try:
+            self._open(writable)
+        except sqlite3.OperationalError:
+            self.close()
+            raise
+        except sqlite3.DatabaseError:
+            self.close()
+            raise ValueError(f"Not a tally database: {file_path}")
+        except ValueError:
+            self.close()
+            raise
+
+    def _open(self, writable: bool):
+        db = self._db
+        application_id = db.execute("PRAGMA application_id").fetchone()[0]
+        if application_id == APPLICATION_ID:
+            version = db.execute("PRAGMA user_version").fetchone()[0]
+            if version != VERSION:
+                raise ValueError(f"Unsupported tally database version {version}: {self.path}")
+        elif writable and db.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0] == 0:
+            # WAL mode is kept in the file, so it only needs setting once
+            db.execute("PRAGMA journal_mode = WAL")
+            with self._transaction():
+                for statement in _SCHEMA:
+                    db.execute(statement)
+                db.execute("INSERT INTO meta (key, value) VALUES ('title', '')")
+                db.execute(f"PRAGMA application_id = {APPLICATION_ID}")
+                db.execute(f"PRAGMA user_version = {VERSION}")
+        else:
+            raise ValueError(f"Not a tally database: {self.path}")
+        # Every commit reaches the disk, like every other save
+        db.execute("PRAGMA synchronous = FULL")
+
+    @contextmanager
+    def _transaction(self):
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    @property
+    def title(self) -> str:
+        return self._db.execute("SELECT value FROM meta WHERE key = 'title'").fetchone()[0]
+
+    # Queries
+
+    def entries(self) -> List[Dict]:
+        """Every entry, in file order"""
+        return _entry_dicts(self._db.execute(
+            "SELECT name, value, last_updated FROM entries ORDER BY row"))
+
+    def get(self, name: str) -> Optional[Dict]:
+        rows = _entry_dicts(self._db.execute(
+            "SELECT name, value, last_updated FROM entries WHERE name = ?", (name,)))
+        return rows[0] if rows else None
+
+    def top(self, count: int, offset: int = 0) -> List[Dict]:
+        """Entries ranked offset + 1 to offset + count, read in order from the rank index"""
+        return _entry_dicts(self._db.execute(
+            f"SELECT name, value, last_updated FROM entries {_RANK_ORDER} LIMIT ? OFFSET ?",
+            (count, offset)))
+
+    def rank_of(self, name: str) -> Optional[int]:
+        """1-based rank of an entry, or None; counts the entries ahead of it in the rank index"""
+        entry = self.get(name)
+        if entry is None:
+            return None
+        value, last_updated = entry["value"], entry["last_updated"]
+        # Three ranges of the index, so each count is a plain index scan
+        ahead = self._db.execute(
+            "SELECT (SELECT COUNT(*) FROM entries WHERE value > :value)"
+            " + (SELECT COUNT(*) FROM entries WHERE value = :value AND last_updated < :stamp)"
+            " + (SELECT COUNT(*) FROM entries WHERE value = :value AND last_updated = :stamp"
+            " AND name < :name)",
+            {"value": value, "stamp": last_updated, "name": name}).fetchone()[0]
+        return ahead + 1
+
+    # Writes
+
+    def write(self, title: str, entries: Iterable[Dict]) -> None:
+        """Replace the whole content, keeping the order of `entries`"""
+        entries = list(entries)
+        try:
+            with self._transaction():
+                self._db.execute("UPDATE meta SET value = ? WHERE key = 'title'", (title,))
+                self._db.execute("DELETE FROM entries")
+                self._db.executemany(
+                    "INSERT INTO entries (row, name, value, last_updated) VALUES (?, ?, ?, ?)",
+                    ((row, entry["name"], entry["value"], entry["last_updated"])
+                     for row, entry in enumerate(entries)))
+        except _STORE_ERRORS as e:
+            raise _explain(entries, e)
+
+    def update(self, title: str, entries: Iterable[Dict], changed: Iterable[str]) -> bool:
+        """Write the title and the changed entries, adding those that are new.
+
+        Returns False without changing anything if entries were removed or
+        renamed as well, which only a full write() can tell; new entries go
+        after the existing ones. Changes missing from `changed` are lost, so
+        anything replayed from a journal needs a full write().
+        """
+        changed = set(changed)
+        entries = list(entries)
+        updates = [entry for entry in entries if entry["name"] in changed]
+        try:
+            with self._transaction():
+                self._db.execute("UPDATE meta SET value = ? WHERE key = 'title'", (title,))
+                self._db.executemany(_UPSERT, ((entry["name"], entry["value"], entry["last_updated"])
+                                               for entry in updates))
+                if len(self) != len(entries):
+                    raise _Mismatch
+        except _Mismatch:
+            return False
+        except _STORE_ERRORS as e:
+            raise _explain(updates, e)
+        return True
+
+
+class _Mismatch(Exception):
+    """Rolls back an update that cannot be applied in place"""
+
+
+def read_tally(file_path: str) -> Dict:
+    """Read a tally database into the same shape as a JSON tally file"""
+    with SqliteTally(file_path) as tally:
+        return {"title": tally.title, "entries": tally.entries()}
+
+
+def write_tally(file_path: str, title: str, entries: Iterable[Dict]) -> None:
+    """Create or replace the content of a tally database"""
+    with SqliteTally(file_path, writable=True) as tally:
+        tally.write(title, entries)
+
+
+def update_tally(file_path: str, title: str, entries: Iterable[Dict],
+                 changed: Iterable[str]) -> bool:
+    """Write only the changed entries; False if a full write is needed"""
+    with SqliteTally(file_path, writable=True) as tally:
+        return tally.update(title, entries, changed)
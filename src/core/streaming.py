@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+import codecs
+import json
+from typing import BinaryIO, Callable, Iterator, Optional, Tuple
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class _ChunkReader:
+    """Incremental JSON tokenizer over a UTF-8 file read in fixed-size chunks"""
+
+    def __init__(self, f: BinaryIO, chunk_size: int,
+                 progress: Optional[Callable[[int], None]] = None):
+        self._file = f
+        self._chunk_size = chunk_size
+        self._progress = progress
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self.bytes_read = 0
+
+    def _fill(self) -> bool:
+        """Read the next chunk, dropping consumed text. Returns False at EOF."""
+        if self._eof:
+            return False
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            text = self._decoder.decode(b"", final=True)
+        else:
+            self.bytes_read += len(chunk)
+            text = self._decoder.decode(chunk)
+            if self._progress:
+                self._progress(self.bytes_read)
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        return bool(chunk) or bool(text)
+
+    def peek(self) -> str:
+        """Get the next non-whitespace character without consuming it"""
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Invalid JSON format: expected '{char}' but found "
+                             f"{found!r} after {self.bytes_read} bytes")
+        self._pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                raise ValueError(f"Invalid JSON format: {e}")
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+
+def iter_tally(f: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE,
+               progress: Optional[Callable[[int], None]] = None) -> Iterator[Tuple[str, object, object]]:
+    """Parse a tally document one entry at a time.
+
+    Yields ("entries", "entries", None) when the top-level "entries" array
+    opens, ("entry", None, entry) for each of its items and ("field", key,
+    value) for every other top-level key, in file order. Only one entry is
+    materialized at a time. `progress` is called with the number of bytes
+    read after each chunk.
+    """
+    reader = _ChunkReader(f, chunk_size, progress)
+    seen_entries = False
+
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.expect("}")
+    else:
+        while True:
+            key = reader.value()
+            if not isinstance(key, str):
+                raise ValueError("Invalid JSON format: object keys must be strings")
+            reader.expect(":")
+
+            if key == "entries" and reader.peek() == "[":
+                if seen_entries:
+                    raise ValueError("Invalid JSON format: duplicate 'entries' key")
+                seen_entries = True
+                yield "entries", key, None
+                reader.expect("[")
+                if reader.peek() == "]":
+                    reader.expect("]")
+                else:
+                    while True:
+                        yield "entry", None, reader.value()
+                        if reader.peek() == ",":
+                            reader.expect(",")
+                            continue
+                        reader.expect("]")
+                        break
+            else:
+                yield "field", key, reader.value()
+
+            if reader.peek() == ",":
+                reader.expect(",")
+                continue
+            reader.expect("}")
+            break
+
+    if reader.peek() != "":
+        raise ValueError("Invalid JSON format: extra data after the document")
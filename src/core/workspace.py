@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+import os
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from core.file_watcher import file_signature
+from core.ranking import Ranking
+
+# Rough memory per ranked entry including its sort key and index slot, as
+# measured by benchmarks/entry_memory.py
+ENTRY_BYTES = 320
+# Fixed cost per cached board: history and widgets' state; the front end
+# drops caches that grow with the list, like formatted dump lines, on stashing
+BOARD_OVERHEAD_BYTES = 64 * 1024
+
+DEFAULT_MEMORY_LIMIT = 256 * 1024 * 1024
+
+
+class Board:
+    """A parsed, validated and ranked tally file kept ready to switch to.
+
+    `signature` is the file's (mtime, size, inode) when its contents were last known
+    to match the board. `dirty` boards hold changes that are not on disk yet
+    and are never evicted. `extras` carries whatever else the front end wants
+    back when switching to the board, e.g. baselines and the selection.
+    """
+
+    def __init__(self, path: str, title: str, ranking: Ranking,
+                 signature: Optional[Tuple] = None, dirty: bool = False,
+                 extras: Optional[Dict] = None):
+        self.path = path
+        self.title = title
+        self.ranking = ranking
+        self.signature = signature
+        self.dirty = dirty
+        self.extras = extras or {}
+
+    def estimated_bytes(self) -> int:
+        return len(self.ranking) * ENTRY_BYTES + BOARD_OVERHEAD_BYTES
+
+
+class Workspace:
+    """LRU cache of boards keyed by path and validated by (mtime, size, inode).
+
+    Clean boards are evicted least recently used first whenever the estimated
+    memory of all boards goes over `memory_limit`; the most recently used one
+    always stays. A clean board whose file changed on disk is dropped on
+    lookup so it is re-read instead of served stale.
+    """
+
+    def __init__(self, memory_limit: int = DEFAULT_MEMORY_LIMIT):
+        self.memory_limit = memory_limit
+        self._boards: "OrderedDict[str, Board]" = OrderedDict()
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.abspath(path)
+
+    def __contains__(self, path: str) -> bool:
+        return self._key(path) in self._boards
+
+    def __len__(self) -> int:
+        return len(self._boards)
+
+    def get(self, path: str) -> Optional[Board]:
+        """The cached board for a file if it is still current, marking it recently used"""
+        key = self._key(path)
+        board = self._boards.get(key)
+        if board is None:
+            return None
+        if not board.dirty and board.signature != file_signature(path):
+            del self._boards[key]
+            return None
+        self._boards.move_to_end(key)
+        return board
+
+    def peek(self, path: str) -> Optional[Board]:
+        """The cached board for a file, without checking or touching it"""
+        return self._boards.get(self._key(path))
+
+    def put(self, board: Board) -> None:
+        """Cache a board as the most recently used one, evicting cold boards if needed"""
+        key = self._key(board.path)
+        self._boards[key] = board
+        self._boards.move_to_end(key)
+        self.evict()
+
+    def discard(self, path: str) -> Optional[Board]:
+        return self._boards.pop(self._key(path), None)
+
+    def memory_used(self) -> int:
+        return sum(board.estimated_bytes() for board in self._boards.values())
+
+    def evict(self) -> List[Board]:
+        """Drop least recently used clean boards until under the memory limit"""
+        evicted = []
+        used = self.memory_used()
+        for key in list(self._boards)[:-1]:
+            if used <= self.memory_limit:
+                break
+            board = self._boards[key]
+            if board.dirty:
+                continue
+            del self._boards[key]
+            used -= board.estimated_bytes()
+            evicted.append(board)
+        return evicted
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Blocking client for the local scoring server (see tally_server.py)"""
+
+import http.client
+import json
+from typing import Dict, List, Optional
+from urllib.parse import urlencode, urlsplit
+
+
+class TallyClient:
+    """Talks to a scoring server over one keep-alive connection.
+
+    Rejected requests raise ValueError with the server's message; anything that
+    stops the request from reaching the server raises RuntimeError.
+    """
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        if "://" not in url:
+            url = "http://" + url
+        parts = urlsplit(url)
+        if parts.scheme != "http" or not parts.hostname:
+            raise ValueError(f"Not a server address: {url}")
+        self.url = f"http://{parts.netloc}"
+        self._host = parts.hostname
+        self._port = parts.port or 80
+        self._timeout = timeout
+        self._connection: Optional[http.client.HTTPConnection] = None
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _request(self, method: str, path: str, payload: Optional[Dict] = None) -> bytes:
+        body = None if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        # Reads may be retried on a fresh connection; writes must not be applied twice
+        attempts = 2 if method == "GET" else 1
+        for attempt in range(attempts):
+            if self._connection is None:
+                self._connection = http.client.HTTPConnection(self._host, self._port,
+                                                              timeout=self._timeout)
+            try:
+                self._connection.request(method, path, body, headers)
+                response = self._connection.getresponse()
+                data = response.read()
+                break
+            except (OSError, http.client.HTTPException) as e:
+                self.close()
+                if attempt == attempts - 1:
+                    raise RuntimeError(f"Cannot reach the server at {self.url}: {e}")
+
+        if response.status >= 400:
+            try:
+                message = json.loads(data)["error"]
+            except (ValueError, KeyError, TypeError):
+                message = data.decode("utf-8", "replace") or response.reason
+            if response.status < 500:
+                raise ValueError(message)
+            raise RuntimeError(message)
+        return data
+
+    def _json(self, method: str, path: str, payload: Optional[Dict] = None) -> Dict:
+        return json.loads(self._request(method, path, payload))
+
+    def state(self) -> Dict:
+        """The title, version and every entry in rank order"""
+        return self._json("GET", "/state")
+
+    def changes(self, since: Optional[int]) -> Dict:
+        """What changed after version `since`; "reset" means a full state instead"""
+        query = "" if since is None else f"?since={since}"
+        return self._json("GET", f"/changes{query}")
+
+    def send(self, records: List[List]) -> int:
+        """Apply journal-style records on the server; returns the new version"""
+        return self._json("POST", "/records", {"records": records})["version"]
+
+    def commit(self) -> int:
+        """Ask the server to write its pending changes now"""
+        return self._json("POST", "/commit", {})["version"]
+
+    def dump(self, top: Optional[int] = None, ranks=None, changed_only: bool = False,
+             since_opened: bool = False) -> str:
+        """The server's simple dump, against its last commit or the time it started"""
+        query = {"baseline": "opened" if since_opened else "commit"}
+        if top:
+            query["top"] = top
+        if ranks:
+            query["ranks"] = f"{ranks[0]}-{ranks[1]}"
+        if changed_only:
+            query["changed"] = 1
+        return self._request("GET", "/dump?" + urlencode(query)).decode("utf-8")
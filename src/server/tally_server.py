@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""Local scoring server: several scorekeepers share one tally file.
+
+A small HTTP/1.1 + JSON API on asyncio. Every mutation goes through one
+writer task that drains the request queue in batches and applies it to the
+in-memory ranking, so requests never race each other. The file itself is
+written by periodic commits through DataManager on a worker thread, batching
+everything that changed since the previous commit into one save.
+
+    GET  /state                 title, version and every entry in rank order
+    GET  /changes?since=V       entries changed after version V
+    GET  /dump?top=&ranks=&changed=&baseline=opened|commit   simple dump text
+    POST /records               {"records": [...]}, journal-style records
+    POST /commit                write pending changes now
+
+Records use the journal format (see core.journal): ["t", title],
+["a", name, value], ["r", old_name, new_name], ["d", name, delta] and
+["x", name]. Any timestamp sent along is ignored; the server stamps records
+as it applies them so scorekeepers are ranked by arrival order.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from core import journal
+from core.data_manager import DataManager
+from core.dump import DumpRenderer
+from core.history import History, LAST_UPDATE, SINCE_OPENED
+from core.ranking import Ranking
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_COMMIT_INTERVAL = 1.0
+
+# Largest number of queued requests the writer applies in one go
+MAX_BATCH = 1024
+# Changed names remembered for /changes; older clients get a full reset
+CHANGE_LOG_SIZE = 100_000
+# Request bodies larger than this are refused
+MAX_BODY = 16 * 1024 * 1024
+
+_PENDING_COMMIT = "\0pending commit"
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+def _is_int(value) -> bool:
+    return type(value) is int
+
+
+def _check_name(name) -> str:
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("Entry names must be non-empty strings")
+    return name.strip()
+
+
+class TallyServer:
+    """Owns one tally file and serves it to any number of clients"""
+
+    def __init__(self, data_manager: DataManager, file_path: str,
+                 host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 commit_interval: float = DEFAULT_COMMIT_INTERVAL):
+        self.data_manager = data_manager
+        self.file_path = file_path
+        self.host = host
+        self.port = port
+        self.commit_interval = commit_interval
+
+        data = data_manager.load_file(file_path)
+        self.title = data["title"]
+        self.ranking = Ranking(data["entries"])
+        self.history = History(self.ranking)
+        self.history.mark(SINCE_OPENED)
+        self.history.mark(LAST_UPDATE)
+        self.dump_renderer = DumpRenderer(self.ranking)
+
+        self.version = 0
+        self.committed_version = 0
+        self._log: deque = deque()        # (version, name) per changed entry
+        self._log_start = 1               # oldest version still fully in the log
+        self._dirty = False
+        self._revalidate_all = False
+        if os.path.exists(journal.journal_path(file_path)):
+            # Replayed journal records are in no changed set, so the first
+            # commit writes and checks the whole file, folding the journal in
+            self._dirty = True
+            self._revalidate_all = True
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._commit_lock: Optional[asyncio.Lock] = None
+        self._server = None
+        self._tasks: List[asyncio.Task] = []
+        self._connections = set()
+
+    # Mutations, only ever run by the writer task
+
+    def _touch(self, name: Optional[str]) -> None:
+        self.version += 1
+        self._dirty = True
+        if name is None:
+            return
+        if len(self._log) >= CHANGE_LOG_SIZE:
+            self._log_start = self._log.popleft()[0] + 1
+        self._log.append((self.version, name))
+
+    def _apply_record(self, record) -> None:
+        if not isinstance(record, list) or not record:
+            raise ValueError(f"Not a record: {record!r}")
+        kind = record[0]
+        ranking = self.ranking
+        if kind == journal.TITLE and len(record) == 2:
+            if not isinstance(record[1], str):
+                raise ValueError("The title must be a string")
+            self.title = record[1]
+            self._touch(None)
+        elif kind == journal.ADD and len(record) in (3, 4):
+            name, value = _check_name(record[1]), record[2]
+            if not _is_int(value):
+                raise ValueError("Values must be integers")
+            if name in ranking:
+                raise ValueError(f"Entry '{name}' already exists")
+            ranking.add(name, value, time.time())
+            self._touch(name)
+        elif kind == journal.RENAME and len(record) == 3:
+            old_name, new_name = record[1], _check_name(record[2])
+            if old_name not in ranking:
+                raise ValueError(f"No entry named '{old_name}'")
+            if new_name != old_name and new_name in ranking:
+                raise ValueError(f"Entry '{new_name}' already exists")
+            ranking.rename(old_name, new_name)
+            self._touch(old_name)
+            self._touch(new_name)
+        elif kind == journal.DELTA and len(record) in (3, 4):
+            name, delta = record[1], record[2]
+            if not _is_int(delta):
+                raise ValueError("Deltas must be integers")
+            if name not in ranking:
+                raise ValueError(f"No entry named '{name}'")
+            ranking.adjust(name, delta, time.time())
+            self._touch(name)
+        elif kind == journal.REMOVE and len(record) == 2:
+            name = record[1]
+            if name not in ranking:
+                raise ValueError(f"No entry named '{name}'")
+            ranking.remove(name)
+            self._touch(name)
+        else:
+            raise ValueError(f"Unknown record: {record!r}")
+
+    def _apply(self, records) -> Tuple[int, Optional[str]]:
+        """Apply records in order until one is invalid; (applied count, error)"""
+        if not isinstance(records, list):
+            return 0, "Expected a list of records"
+        for applied, record in enumerate(records):
+            try:
+                self._apply_record(record)
+            except ValueError as e:
+                return applied, str(e)
+        return len(records), None
+
+    async def _write_loop(self):
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < MAX_BATCH:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            for records, future in batch:
+                result = self._apply(records)
+                if not future.done():
+                    future.set_result(result)
+
+    async def submit(self, records) -> Dict:
+        """Queue records for the writer and wait until they are applied"""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((records, future))
+        applied, error = await future
+        result = {"version": self.version, "applied": applied}
+        if error is not None:
+            result["error"] = error
+        return result
+
+    # Commits
+
+    async def commit(self) -> int:
+        """Write everything applied so far to the file; returns the committed version"""
+        async with self._commit_lock:
+            if not self._dirty:
+                return self.committed_version
+
+            version = self.version
+            title = self.title
+            snapshot = self.ranking.to_list()
+            changed = None if self._revalidate_all else self.ranking.changed_names()
+            self.ranking.clear_changes()
+            self._dirty = False
+            self._revalidate_all = False
+            self.history.mark(_PENDING_COMMIT)
+
+            try:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self.data_manager.save_file, self.file_path, title, snapshot, changed)
+            except Exception as e:
+                self._dirty = True
+                self._revalidate_all = True
+                self.history.discard(_PENDING_COMMIT)
+                raise RuntimeError(f"Commit failed: {e}")
+
+            self.history.rename(_PENDING_COMMIT, LAST_UPDATE)
+            self.committed_version = version
+            return version
+
+    async def _commit_loop(self):
+        while True:
+            await asyncio.sleep(self.commit_interval)
+            try:
+                await self.commit()
+            except RuntimeError as e:
+                print(f"tally server: {e}", file=sys.stderr)
+
+    # Queries
+
+    def state(self) -> Dict:
+        return {"version": self.version, "title": self.title,
+                "entries": self.ranking.to_list()}
+
+    def changes(self, since: Optional[int]) -> Dict:
+        """Entries changed after version `since`, or everything if that is too old"""
+        if since is None or since > self.version or since < self._log_start - 1:
+            result = self.state()
+            result["reset"] = True
+            return result
+
+        names = set()
+        for version, name in reversed(self._log):
+            if version <= since:
+                break
+            names.add(name)
+        ranking = self.ranking
+        return {
+            "version": self.version,
+            "title": self.title,
+            "reset": False,
+            "entries": [ranking.get(name).to_dict() for name in names if name in ranking],
+            "removed": [name for name in names if name not in ranking],
+        }
+
+    def dump(self, query: Dict[str, List[str]]) -> str:
+        filters = {}
+        if query.get("top"):
+            filters["top"] = int(query["top"][0])
+        if query.get("ranks"):
+            first, last = (int(part) for part in query["ranks"][0].split("-", 1))
+            filters["ranks"] = (first, last)
+        filters["changed_only"] = query.get("changed", ["0"])[0] in ("1", "true", "yes")
+        label = SINCE_OPENED if query.get("baseline", ["commit"])[0] == "opened" else LAST_UPDATE
+        return self.dump_renderer.render(self.title, self.history.get(label), **filters)
+
+    # HTTP
+
+    async def _route(self, method: str, target: str, body: bytes) -> Tuple[int, str, bytes]:
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        routes = {
+            "/state": "GET", "/changes": "GET", "/dump": "GET",
+            "/records": "POST", "/commit": "POST",
+        }
+        if url.path not in routes:
+            return 404, "application/json", b'{"error": "Not found"}'
+        if method != routes[url.path]:
+            return 405, "application/json", b'{"error": "Method not allowed"}'
+
+        status = 200
+        try:
+            if url.path == "/state":
+                result = self.state()
+            elif url.path == "/changes":
+                since = query.get("since", [""])[0]
+                result = self.changes(int(since) if since else None)
+            elif url.path == "/dump":
+                return 200, "text/plain; charset=utf-8", self.dump(query).encode("utf-8")
+            elif url.path == "/records":
+                try:
+                    records = json.loads(body)["records"]
+                except (ValueError, KeyError, TypeError):
+                    raise ValueError('Expected a JSON object like {"records": [...]}')
+                result = await self.submit(records)
+                if "error" in result:
+                    status = 400
+            else:
+                result = {"version": await self.commit()}
+        except ValueError as e:
+            status, result = 400, {"error": str(e)}
+        except RuntimeError as e:
+            status, result = 500, {"error": str(e)}
+
+        payload = json.dumps(result, ensure_ascii=False, separators=(',', ':'))
+        return status, "application/json", payload.encode("utf-8")
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter):
+        """Serve requests on one connection until the client closes it"""
+        self._connections.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY:
+                    status, content_type, payload = 413, "application/json", b'{"error": "Too large"}'
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, content_type, payload = await self._route(method, target, body)
+                    keep_alive = (version == "HTTP/1.1"
+                                  and headers.get("connection", "").lower() != "close")
+
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                    + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    # Lifecycle
+
+    async def start(self) -> None:
+        """Start listening; with port 0 the chosen port is stored in self.port"""
+        self._queue = asyncio.Queue()
+        self._commit_lock = asyncio.Lock()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._tasks = [asyncio.create_task(self._write_loop()),
+                       asyncio.create_task(self._commit_loop())]
+
+    async def close(self) -> None:
+        """Stop serving and commit whatever is still pending"""
+        if self._server is not None:
+            self._server.close()
+            # Idle keep-alive connections would otherwise hold wait_closed() up
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.commit()
+
+    async def run(self) -> None:
+        """Serve until cancelled, e.g. by Ctrl+C"""
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import threading
+from typing import Optional
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from core.ranking import Ranking
+
+
+class BackgroundLoader(QObject):
+    """Loads, validates and ranks a tally file on a worker thread.
+
+    The ranking is built entirely on the worker and only handed over once it
+    is complete, so nothing is shared with the UI thread while it loads.
+    Results come back through Qt signals, which are delivered on the thread
+    that owns this object.
+    """
+
+    loaded = pyqtSignal(str, str, object)   # file path, title, ranking
+    failed = pyqtSignal(str, str)           # file path, error message
+
+    def __init__(self, data_manager, parent=None):
+        super().__init__(parent)
+        self._data_manager = data_manager
+        self._thread: Optional[threading.Thread] = None
+
+    def load(self, file_path: str):
+        """Start loading a file; only one load runs at a time"""
+        if self.is_busy():
+            raise RuntimeError("A file is already loading")
+        self._thread = threading.Thread(target=self._run, args=(file_path,),
+                                        name="tally-loader", daemon=True)
+        self._thread.start()
+
+    def is_busy(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until the running load has finished"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not self.is_busy()
+
+    def _run(self, file_path: str):
+        try:
+            data = self._data_manager.load_file(file_path)
+            # Sorting everything once is much faster than inserting entry by entry
+            ranking = Ranking(data["entries"])
+            self.loaded.emit(file_path, data["title"], ranking)
+        except Exception as e:
+            self.failed.emit(file_path, str(e))
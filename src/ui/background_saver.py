@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class BackgroundSaver(QObject):
+    """Writes tally snapshots on a worker thread.
+
+    Only one write runs at a time. Requests for the same file that arrive
+    while a write is in flight replace each other, so a burst of Updates turns
+    into a single write of the newest snapshot; requests for other files wait
+    their turn in the order they came. Results come back through Qt signals, which are
+    delivered on the thread that owns this object.
+    """
+
+    saved = pyqtSignal(object, object)  # token of the request that was written, file signature
+    failed = pyqtSignal(object, str)    # token, error message
+
+    def __init__(self, data_manager, parent=None):
+        super().__init__(parent)
+        self._data_manager = data_manager
+        self._condition = threading.Condition()
+        self._pending: "OrderedDict[str, Dict]" = OrderedDict()  # by absolute path
+        self._busy = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="tally-saver", daemon=True)
+        self._thread.start()
+
+    def request_save(self, token, file_path: str, title: str, entries: List[Dict],
+                     changed: Optional[Iterable[str]] = None):
+        """Queue a snapshot to be written, replacing any request for the same
+        file not yet started"""
+        key = os.path.abspath(file_path)
+        with self._condition:
+            pending = self._pending.get(key)
+            if pending is not None:
+                # Coalesced requests must re-check every entry either of them changed
+                if pending["changed"] is None or changed is None:
+                    changed = None
+                else:
+                    changed = pending["changed"] | set(changed)
+            elif changed is not None:
+                changed = set(changed)
+
+            self._pending[key] = {
+                "token": token,
+                "file_path": file_path,
+                "title": title,
+                "entries": entries,
+                "changed": changed
+            }
+            self._condition.notify_all()
+
+    def is_busy(self) -> bool:
+        """Whether a write is running or queued"""
+        with self._condition:
+            return self._busy or bool(self._pending)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued write has finished"""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._busy and not self._pending, timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Finish queued writes and stop the worker thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                _, request = self._pending.popitem(last=False)
+                self._busy = True
+
+            try:
+                signature = self._data_manager.save_file(request["file_path"], request["title"],
+                                                         request["entries"], request["changed"])
+                self.saved.emit(request["token"], signature)
+            except Exception as e:
+                self.failed.emit(request["token"], str(e))
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
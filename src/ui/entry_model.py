@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+from typing import Callable, Optional
+
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt
+from PyQt5.QtWidgets import QStyledItemDelegate
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from core.ranking import Ranking
+
+# Custom data roles exposed by EntryListModel
+NameRole = Qt.UserRole
+ValueRole = Qt.UserRole + 1
+RankRole = Qt.UserRole + 2
+ChangeRole = Qt.UserRole + 3
+
+
+def format_entry_row(rank: int, name: str, value: int, change_text: str) -> str:
+    """Format one entry the way it is shown in the list"""
+    return f"#{rank:2d}  {name:<20} {value:3d} points{change_text}"
+
+
+class EntryListModel(QAbstractListModel):
+    """List model over a Ranking.
+
+    Rows are read straight from the ranking on demand, and every mutation goes
+    through this model so it can emit a targeted move or dataChanged signal for
+    just the entry that changed instead of resetting the whole list.
+
+    Any of those signals makes QListView lay out every row again, so score
+    changes can also be batched: between begin_batch() and end_batch() values
+    change in the ranking straight away but the view hears about them once,
+    as a single layout change. Adding, removing or renaming entries ends the
+    batch first.
+    """
+
+    def __init__(self, ranking: Ranking,
+                 change_text: Optional[Callable[[str, int], str]] = None, parent=None):
+        super().__init__(parent)
+        self._ranking = ranking
+        self._change_text = change_text or (lambda name, value: "")
+        self._batch = None  # (persistent index, entry name) pairs while batching
+
+    @property
+    def ranking(self) -> Ranking:
+        return self._ranking
+
+    def set_ranking(self, ranking: Ranking):
+        """Swap in a different ranking, resetting the view"""
+        self.end_batch()
+        self.beginResetModel()
+        self._ranking = ranking
+        self.endResetModel()
+
+    # Qt model interface
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._ranking)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._ranking):
+            return None
+
+        entry = self._ranking.entry_at(index.row())
+        if role == NameRole:
+            return entry.name
+        if role == ValueRole:
+            return entry.value
+        if role == RankRole:
+            return index.row() + 1
+        if role == ChangeRole:
+            return self._change_text(entry.name, entry.value)
+        if role == Qt.DisplayRole:
+            return format_entry_row(index.row() + 1, entry.name, entry.value,
+                                    self._change_text(entry.name, entry.value))
+        return None
+
+    # Helpers
+
+    def index_of(self, name: str) -> QModelIndex:
+        """Get the model index of an entry by name"""
+        self.end_batch()  # Views only take indexes of a settled layout
+        if name not in self._ranking:
+            return QModelIndex()
+        return self.index(self._ranking.rank_of(name) - 1)
+
+    def refresh_all(self):
+        """Repaint every row, e.g. after the change baseline moved"""
+        self.end_batch()
+        if len(self._ranking):
+            self.dataChanged.emit(self.index(0), self.index(len(self._ranking) - 1))
+
+    # Batching
+
+    def in_batch(self) -> bool:
+        return self._batch is not None
+
+    def begin_batch(self):
+        """Start holding back row moves until end_batch()"""
+        if self._batch is not None:
+            return
+        self.layoutAboutToBeChanged.emit()
+        self._batch = [(index, self._ranking.entry_at(index.row()).name)
+                       for index in self.persistentIndexList()
+                       if index.isValid() and index.row() < len(self._ranking)]
+
+    def end_batch(self):
+        """Show every change made since begin_batch() in one layout change"""
+        if self._batch is None:
+            return
+        batch, self._batch = self._batch, None
+        # Selections and the current row follow their entries to their new rows
+        old = [index for index, _ in batch]
+        new = [self.index(self._ranking.rank_of(name) - 1) if name in self._ranking else QModelIndex()
+               for _, name in batch]
+        self.changePersistentIndexList(old, new)
+        self.layoutChanged.emit()
+
+    # Mutations
+
+    def add_entry(self, name: str, value: int, last_updated: float):
+        """Add an entry and insert just its row"""
+        if name in self._ranking:
+            raise ValueError(f"Entry '{name}' already exists")
+        self.end_batch()
+        row = self._ranking.row_for(name, value, last_updated)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._ranking.add(name, value, last_updated)
+        self.endInsertRows()
+
+    def remove_entry(self, name: str):
+        """Remove an entry and just its row"""
+        self.end_batch()
+        row = self._ranking.rank_of(name) - 1
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self._ranking.remove(name)
+        self.endRemoveRows()
+
+    def apply_bulk(self, changes):
+        """Apply many changes at once; the view is reset once instead of per row"""
+        self.end_batch()
+        self.beginResetModel()
+        try:
+            return self._ranking.apply_bulk(changes)
+        finally:
+            self.endResetModel()
+
+    def set_value(self, name: str, value: int, last_updated: float):
+        """Set an entry's value and timestamp, moving its row if its rank changed"""
+        self._move_entry(name, value, last_updated, None)
+
+    def adjust(self, name: str, delta: int, last_updated: float):
+        """Change an entry's value by `delta`"""
+        entry = self._ranking.get(name)
+        if entry is None:
+            raise KeyError(name)
+        self._move_entry(name, entry.value + delta, last_updated, None)
+
+    def rename(self, old_name: str, new_name: str):
+        """Rename an entry, moving its row if the name breaks a tie differently"""
+        entry = self._ranking.get(old_name)
+        if entry is None:
+            raise KeyError(old_name)
+        if new_name != old_name and new_name in self._ranking:
+            raise ValueError(f"Entry '{new_name}' already exists")
+        self.end_batch()  # Batched rows are matched up by name
+        self._move_entry(old_name, entry.value, entry.last_updated, new_name)
+
+    def _move_entry(self, name: str, value: int, last_updated: float,
+                    new_name: Optional[str]):
+        if self._batch is not None:
+            self._ranking.set_value(name, value, last_updated)
+            return
+
+        old_row = self._ranking.rank_of(name) - 1
+        new_row = self._ranking.row_for(name, value, last_updated, new_name)
+
+        def apply():
+            self._ranking.set_value(name, value, last_updated)
+            if new_name is not None:
+                self._ranking.rename(name, new_name)
+
+        if new_row == old_row:
+            apply()
+            index = self.index(new_row)
+            self.dataChanged.emit(index, index)
+            return
+
+        # Qt expects the destination as the row the entry is inserted before
+        destination = new_row if new_row < old_row else new_row + 1
+        self.beginMoveRows(QModelIndex(), old_row, old_row, QModelIndex(), destination)
+        apply()
+        self.endMoveRows()
+
+        # Every row between the old and new position shifted rank by one
+        first, last = min(old_row, new_row), max(old_row, new_row)
+        self.dataChanged.emit(self.index(first), self.index(last))
+
+
+class EntryDelegate(QStyledItemDelegate):
+    """Formats entry rows from the model's roles only when they are painted"""
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        name = index.data(NameRole)
+        if name is not None:
+            option.text = format_entry_row(index.data(RankRole), name,
+                                           index.data(ValueRole), index.data(ChangeRole))
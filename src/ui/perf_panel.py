@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import (QCheckBox, QDialog, QFileDialog, QHBoxLayout, QHeaderView,
+                             QLabel, QMessageBox, QPushButton, QTableWidget,
+                             QTableWidgetItem, QVBoxLayout)
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from core import perf
+
+REFRESH_INTERVAL = 500  # ms between table updates while the panel is open
+
+COLUMNS = ["Operation", "Calls", "Last ms", "p50 ms", "p90 ms", "p99 ms", "Max ms", "Total s"]
+
+
+class PerfPanel(QDialog):
+    """Debug panel showing recent latencies of the timed operations.
+
+    Timing is switched on while the panel's checkbox is ticked; the recorded
+    calls can be saved as a trace file to attach to a bug report.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Performance")
+        self.resize(720, 360)
+
+        layout = QVBoxLayout(self)
+        self.enabled_check = QCheckBox("Record timings")
+        self.enabled_check.setChecked(perf.is_enabled())
+        self.enabled_check.toggled.connect(perf.enable)
+        layout.addWidget(self.enabled_check)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.table)
+
+        self.counters_label = QLabel()
+        self.counters_label.setWordWrap(True)
+        layout.addWidget(self.counters_label)
+
+        buttons = QHBoxLayout()
+        clear_btn = QPushButton("Clear")
+        trace_btn = QPushButton("💾 Save Trace")
+        clear_btn.clicked.connect(self.clear)
+        trace_btn.clicked.connect(self.save_trace)
+        buttons.addWidget(clear_btn)
+        buttons.addStretch()
+        buttons.addWidget(trace_btn)
+        layout.addLayout(buttons)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_INTERVAL)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start()
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        """Show the latest numbers, slowest operations first"""
+        rows = sorted(perf.stats().items(), key=lambda item: item[1]["total"], reverse=True)
+        self.table.setRowCount(len(rows))
+        for row, (name, stat) in enumerate(rows):
+            cells = [name, str(stat["calls"])]
+            cells += [f"{stat[key] * 1000:.2f}" for key in ("last", "p50", "p90", "p99", "max")]
+            cells.append(f"{stat['total']:.3f}")
+            for column, text in enumerate(cells):
+                self.table.setItem(row, column, QTableWidgetItem(text))
+
+        counts = perf.counters()
+        self.counters_label.setText(
+            "Counters: " + ", ".join(f"{name} {value}" for name, value in sorted(counts.items()))
+            if counts else "")
+
+    def clear(self):
+        perf.reset()
+        self.refresh()
+
+    def save_trace(self):
+        """Write the recorded calls as a trace file"""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Save Trace", "tally-trace.json", "Trace files (*.json);;All files (*)")
+        if not file_path:
+            return
+        try:
+            events = perf.write_trace(file_path)
+        except RuntimeError as e:
+            QMessageBox.critical(self, "Error Saving Trace", str(e))
+            return
+        QMessageBox.information(self, "Trace Saved",
+                                f"Saved {events} events to {os.path.basename(file_path)}.\n"
+                                "Open it in chrome://tracing or ui.perfetto.dev.")
@@ -4,15 +4,45 @@ import sys
 import time
 import os
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, 
-                             QWidget, QPushButton, QLineEdit, QListWidget, QLabel, 
-                             QListWidgetItem, QMessageBox, QInputDialog, QFileDialog)
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont
+                             QWidget, QPushButton, QLineEdit, QListView, QLabel, 
+                             QAbstractItemView, QMessageBox, QInputDialog, QFileDialog,
+                             QCheckBox, QComboBox, QSpinBox, QShortcut)
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QFont, QKeySequence
 
 # Import our modules
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from core import columnar, journal, oplog, perf, sqlite_store
 from core.data_manager import DataManager
+from core.dump import DumpRenderer, position_change_indicator, value_change_text
+from core.file_watcher import FileWatcher, plan_merge
+from core.history import History, LAST_UPDATE, SINCE_OPENED
+from core.name_index import NameIndex
+from core.parse_cache import ParseCache
+from core.ranking import Ranking
 from core.settings import Settings
+from core.workspace import Board, Workspace
+from ui.background_loader import BackgroundLoader
+from ui.background_saver import BackgroundSaver
+from ui.entry_model import EntryListModel, EntryDelegate, NameRole
+from ui.server_link import ServerLink
+from ui.update_scheduler import UpdateScheduler
+
+# Label prefix for baselines of snapshots that are still being saved
+_PENDING_SAVE = "\0pending save "
+
+# How often an attached window asks the scoring server for changes, in ms
+SERVER_POLL_INTERVAL = 250
+# How long a request to the scoring server may take before it fails, in s
+SERVER_TIMEOUT = 2.0
+# How often the open file is checked for changes made elsewhere, in ms
+FILE_CHECK_INTERVAL = 2000
+
+# Matches the find box steps through with Enter, best ranked first
+SEARCH_MATCHES = 100
+
+TALLY_FILE_FILTER = ("Tally Files (*.json *.tally *.sqlite);;JSON Files (*.json);;"
+                     "Binary Tally Files (*.tally);;SQLite Databases (*.sqlite);;All Files (*)")
 
 
 class PyQtTallyApp(QMainWindow):
@@ -26,19 +56,73 @@ class PyQtTallyApp(QMainWindow):
         
         # Current data
         self.title = "New Tally List"
-        self.entries = []
+        self.ranking = Ranking()
         self.selected_entry_name = None  # Track by name instead of index
         self.current_file_path = None    # Track the current file
-        self.previous_positions = {}     # Track previous positions for change indicators
-        self.previous_values = {}        # Track previous values for change indicators
+        self.history = None              # Baselines for change indicators
+        self.dump_renderer = DumpRenderer(self.ranking)  # Caches formatted dump lines
+        self.baseline_label = LAST_UPDATE  # Baseline the indicators compare against
+        self.committed_title = self.title  # Title as of the last journal record or save
+        self.undo_log = oplog.OpLog()     # Undo/redo steps of the changes made here
         
-        # Initialize data manager and settings
-        schema_path = os.path.join(os.path.dirname(__file__), '..', 'core', 'schema.json')
-        self.data_manager = DataManager(schema_path)
+        # Initialize settings and the data manager; validated parses are cached
+        # next to the settings so unchanged files reopen without re-validating
         self.settings = Settings()
+        schema_path = os.path.join(os.path.dirname(__file__), '..', 'core', 'schema.json')
+        self.data_manager = DataManager(
+            schema_path, parse_cache=ParseCache(os.path.join(self.settings.settings_dir, "cache")))
+        
+        # Boards switched away from stay parsed and ranked until memory runs short
+        self.workspace = Workspace(self.settings.get_workspace_memory_limit())
+        self.open_files = [path for path in self.settings.get_open_files() if os.path.exists(path)]
+        
+        # Saves run on a worker thread; results come back as signals
+        self.saver = BackgroundSaver(self.data_manager, self)
+        self.saver.saved.connect(self._on_save_finished)
+        self.saver.failed.connect(self._on_save_failed)
+        self._save_token = 0
+        self._pending_saves = {}         # token -> (file path, history, baseline and title of the snapshot)
+        self._revalidate_all = False     # a failed save leaves changes unvalidated
+        self._unjournaled = False        # some change since the last save is not in the journal
+        self._journal_synced = False     # every change since the last save is synced in the journal
+        
+        # The last file loads on a worker thread after the window is up
+        self.loader = BackgroundLoader(self.data_manager, self)
+        self.loader.loaded.connect(self._on_startup_loaded)
+        self.loader.failed.connect(self._on_startup_load_failed)
+        
+        # Attached to a scoring server, the server owns the file and the window
+        # sends it every change and polls it for everyone else's; requests
+        # run on the link's worker thread
+        self.client = None               # a ServerLink while attached
+        self.server_version = None       # last server version applied here; None resyncs
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(SERVER_POLL_INTERVAL)
+        self.poll_timer.timeout.connect(self._poll_server)
+        
+        # Changes other people make to the open file are merged in, not reloaded
+        self.file_watcher = None
+        self.synced_title = self.title   # Title as of the last load, save or merge
+        self.file_check_timer = QTimer(self)
+        self.file_check_timer.setInterval(FILE_CHECK_INTERVAL)
+        self.file_check_timer.timeout.connect(self.check_external_changes)
+        
+        self.perf_panel = None
+        
+        # Prefix index for the find box, built for the current ranking on first use
+        self.name_index = None
+        self._search_matches = []
+        self._search_total = 0
+        self._search_position = 0
+        
+        # Window-wide shortcuts, switched off with everything else during a load
+        self._window_shortcuts = []
+        self._paused_timers = []
+        self._loading = False
         
         self.setup_ui()
         self.load_last_file_or_start_empty()
+        self.file_check_timer.start()
         
     def setup_ui(self):
         # Central widget
@@ -52,24 +136,52 @@ class PyQtTallyApp(QMainWindow):
         file_layout = QHBoxLayout()
         self.load_btn = QPushButton("📂 Load File")
         self.new_btn = QPushButton("📄 New File") 
+        self.attach_btn = QPushButton("🔌 Attach Server")
         self.update_btn = QPushButton("💾 Update")
         
         self.load_btn.clicked.connect(self.load_file)
         self.new_btn.clicked.connect(self.new_file)
+        self.attach_btn.clicked.connect(self.attach_server)
         self.update_btn.clicked.connect(self.update_file)
         
+        # Journal mode appends each change to a sidecar log as it happens
+        self.journal_check = QCheckBox("Journal changes")
+        self.journal_check.setChecked(self.settings.get_journal_mode())
+        self.journal_check.toggled.connect(self._on_journal_toggled)
+        
         file_layout.addWidget(self.load_btn)
         file_layout.addWidget(self.new_btn)
+        file_layout.addWidget(self.attach_btn)
         file_layout.addStretch()
+        file_layout.addWidget(self.journal_check)
         file_layout.addWidget(self.update_btn)
         layout.addLayout(file_layout)
         
+        # Debug panel with operation timings, kept out of the way
+        self._window_shortcuts.append(
+            QShortcut(QKeySequence("Ctrl+Shift+P"), self, self.show_perf_panel))
+        
+        # Board switcher for the files open in the workspace
+        board_layout = QHBoxLayout()
+        board_label = QLabel("Board:")
+        self.board_combo = QComboBox()
+        self.close_board_btn = QPushButton("✖ Close Board")
+        
+        self.board_combo.activated[int].connect(self.on_board_selected)
+        self.close_board_btn.clicked.connect(self.close_board)
+        
+        board_layout.addWidget(board_label)
+        board_layout.addWidget(self.board_combo, 1)
+        board_layout.addWidget(self.close_board_btn)
+        layout.addLayout(board_layout)
+        
         # Title section
         title_layout = QHBoxLayout()
         title_label = QLabel("Title:")
         self.title_edit = QLineEdit(self.title)
         self.title_edit.setFont(QFont("Arial", 12, QFont.Bold))
         self.title_edit.textChanged.connect(self.on_title_changed)
+        self.title_edit.editingFinished.connect(self.on_title_edited)
         
         title_layout.addWidget(title_label)
         title_layout.addWidget(self.title_edit)
@@ -90,103 +202,396 @@ class PyQtTallyApp(QMainWindow):
         add_layout.addWidget(self.add_btn)
         layout.addLayout(add_layout)
         
-        # Entries list
-        self.entries_list = QListWidget()
+        # Find section: jumps to entries by the start of their name as you type
+        find_layout = QHBoxLayout()
+        find_label = QLabel("Find:")
+        self.find_edit = QLineEdit()
+        self.find_edit.setPlaceholderText("Start of a name, Enter for the next match...")
+        self.find_edit.setClearButtonEnabled(True)
+        self.find_status = QLabel()
+        
+        self.find_edit.textEdited.connect(self.on_find_edited)
+        self.find_edit.returnPressed.connect(self.next_find_match)
+        self._window_shortcuts.append(QShortcut(QKeySequence.Find, self, self.find_edit.setFocus))
+        
+        find_layout.addWidget(find_label)
+        find_layout.addWidget(self.find_edit)
+        find_layout.addWidget(self.find_status)
+        layout.addLayout(find_layout)
+        
+        # Entries list, backed by a model over the ranking so only changed rows are touched
+        self.entries_model = EntryListModel(self.ranking, self._get_value_change_text, self)
+        self.entries_list = QListView()
         self.entries_list.setFont(QFont("Courier", 11))
-        self.entries_list.itemClicked.connect(self.on_item_selected)
-        self.entries_list.itemDoubleClicked.connect(self.edit_selected_name)
+        self.entries_list.setModel(self.entries_model)
+        self.entries_list.setItemDelegate(EntryDelegate(self.entries_list))
+        self.entries_list.setUniformItemSizes(True)
+        self.entries_list.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.entries_list.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.entries_list.selectionModel().currentChanged.connect(self.on_item_selected)
+        self.entries_list.doubleClicked.connect(self.edit_selected_name)
         layout.addWidget(self.entries_list)
         
+        # Scores change at once, but the list is redrawn at most once a frame
+        self.update_scheduler = UpdateScheduler(self.entries_model, self)
+        
         # Control buttons
         control_layout = QHBoxLayout()
         self.increment_btn = QPushButton("➕ +1")
         self.decrement_btn = QPushButton("➖ -1") 
+        self.step_btn = QPushButton("➕ +N")
+        self.step_spin = QSpinBox()
+        self.step_spin.setRange(1, 1000)
+        self.step_spin.setValue(5)
+        self.step_spin.setPrefix("N = ")
+        self.import_btn = QPushButton("📥 Import Scores")
+        
+        self.undo_btn = QPushButton("↩ Undo")
+        self.redo_btn = QPushButton("↪ Redo")
         
         self.increment_btn.clicked.connect(self.increment_selected)
         self.decrement_btn.clicked.connect(self.decrement_selected)
+        self.step_btn.clicked.connect(self.add_step_to_selected)
+        self.import_btn.clicked.connect(self.import_scores)
+        self.undo_btn.clicked.connect(self.undo)
+        self.redo_btn.clicked.connect(self.redo)
+        # Text fields keep their own undo while they have focus
+        self._window_shortcuts += [QShortcut(QKeySequence.Undo, self, self.undo),
+                                   QShortcut(QKeySequence.Redo, self, self.redo)]
+        
+        # Scoring keys work while the list has focus, so names can still be typed
+        for keys, slot in (("+", self.increment_selected), ("=", self.increment_selected),
+                           ("-", self.decrement_selected),
+                           ("Ctrl++", self.add_step_to_selected), ("Ctrl+=", self.add_step_to_selected)):
+            QShortcut(QKeySequence(keys), self.entries_list, slot, context=Qt.WidgetShortcut)
+        for key, slot in ((Qt.Key_Plus, self.increment_selected), (Qt.Key_Minus, self.decrement_selected)):
+            QShortcut(QKeySequence(Qt.KeypadModifier | key), self.entries_list, slot,
+                      context=Qt.WidgetShortcut)
         
         control_layout.addWidget(self.increment_btn)
         control_layout.addWidget(self.decrement_btn)
+        control_layout.addWidget(self.step_btn)
+        control_layout.addWidget(self.step_spin)
+        control_layout.addWidget(self.undo_btn)
+        control_layout.addWidget(self.redo_btn)
         control_layout.addStretch()
+        control_layout.addWidget(self.import_btn)
         layout.addLayout(control_layout)
         
         # Instructions
-        instructions = QLabel("Double-click entry to edit name | Select entry and use +/- buttons")
+        instructions = QLabel("Double-click entry to edit name | Select entry and use +/- buttons "
+                              "or keys, Ctrl++ for +N")
         instructions.setStyleSheet("color: gray; font-size: 10px;")
         layout.addWidget(instructions)
         
+        # Baseline selection for change indicators
+        baseline_layout = QHBoxLayout()
+        baseline_label = QLabel("Compare to:")
+        self.baseline_combo = QComboBox()
+        self.mark_baseline_btn = QPushButton("📌 Mark Baseline")
+        self.compare_file_btn = QPushButton("📂 Compare File")
+        
+        self.baseline_combo.activated[str].connect(self.on_baseline_selected)
+        self.mark_baseline_btn.clicked.connect(self.mark_baseline)
+        self.compare_file_btn.clicked.connect(self.compare_with_file)
+        
+        baseline_layout.addWidget(baseline_label)
+        baseline_layout.addWidget(self.baseline_combo, 1)
+        baseline_layout.addWidget(self.mark_baseline_btn)
+        baseline_layout.addWidget(self.compare_file_btn)
+        layout.addLayout(baseline_layout)
+        
         # Bottom buttons
         bottom_layout = QHBoxLayout()
+        top_label = QLabel("Top:")
+        self.dump_top_spin = QSpinBox()
+        self.dump_top_spin.setRange(0, 1000000)
+        self.dump_top_spin.setSpecialValueText("All")
+        self.dump_changed_check = QCheckBox("Changed only")
         self.copy_simple_btn = QPushButton("📋 Copy Simple Dump")
+        self.save_dump_btn = QPushButton("💾 Save Dump")
         
         self.copy_simple_btn.clicked.connect(self.copy_simple_dump)
+        self.save_dump_btn.clicked.connect(self.save_simple_dump)
         
         bottom_layout.addStretch()
+        bottom_layout.addWidget(top_label)
+        bottom_layout.addWidget(self.dump_top_spin)
+        bottom_layout.addWidget(self.dump_changed_check)
         bottom_layout.addWidget(self.copy_simple_btn)
+        bottom_layout.addWidget(self.save_dump_btn)
         bottom_layout.addStretch()
         layout.addLayout(bottom_layout)
         
     def load_last_file_or_start_empty(self):
-        """Load the last opened file, or start with empty data"""
-        last_file = self.settings.get_last_file()
-        
-        if last_file and os.path.exists(last_file):
-            try:
-                data = self.data_manager.load_file(last_file)
-                self.title = data["title"]
-                self.entries = data["entries"]
-                self.current_file_path = last_file
-                self.title_edit.setText(self.title)
-                self.refresh_display()
-                self.update_window_title()
-                # Capture initial positions and values as baseline
-                self._capture_current_state()
-                return
-            except Exception:
-                # If loading fails, just start empty
-                pass
-        
+        """Start with empty data and load the last opened file in the background"""
         # Start with empty data
         self.title = "New Tally List"
-        self.entries = []
+        self.committed_title = self.title
+        self.ranking = Ranking()
         self.current_file_path = None
+        self._watch_current_file()
+        self.title_edit.setText(self.title)
+        self.refresh_display()
+        self.update_window_title()
+        # Start change tracking (empty, but sets up tracking)
+        self._reset_baselines()
+        self._refresh_board_combo()
+        
+        # The window shows up straight away however big the file is; edits
+        # wait until it is in
+        last_file = self.settings.get_last_file()
+        if last_file and os.path.exists(last_file) and not self.loader.is_busy():
+            filename = os.path.basename(last_file)
+            self.centralWidget().setEnabled(False)
+            self.statusBar().showMessage(f"Loading {filename}...")
+            self.setWindowTitle(f"Tally - Loading {filename}...")
+            self.loader.load(last_file)
+    
+    def _on_startup_loaded(self, file_path, title, ranking):
+        """Show the last file once the background load finishes"""
+        self.centralWidget().setEnabled(True)
+        self.statusBar().clearMessage()
+        self.title = title
+        self.committed_title = self.title
+        self.ranking = ranking
+        self.current_file_path = file_path
+        self._watch_current_file()
         self.title_edit.setText(self.title)
         self.refresh_display()
         self.update_window_title()
-        # Capture initial positions and values as baseline (empty, but sets up tracking)
-        self._capture_current_state()
+        # Start change tracking from the loaded state
+        self._reset_baselines()
+        self._add_open_file(file_path)
+    
+    def _on_startup_load_failed(self, file_path, message):
+        """Stay empty if the last file cannot be loaded"""
+        self.centralWidget().setEnabled(True)
+        self.update_window_title()
+        self.statusBar().showMessage(f"Could not open {os.path.basename(file_path)}: {message}", 5000)
+        
+    def _stream_file(self, file_path):
+        """Load a file entry by entry, showing how far it got; the caller shows
+        the ranking once it is complete, as every redraw of the partial list
+        would lay out all of it again"""
+        ranking = Ranking()
+        filename = os.path.basename(file_path)
         
+        def on_progress(bytes_read, total_bytes):
+            percent = bytes_read * 100 // total_bytes if total_bytes else 100
+            self.statusBar().showMessage(f"Loading {filename}... {percent}%")
+            QApplication.processEvents()
+        
+        # Keep the window responsive but block edits until the load finishes
+        self._set_loading(True)
+        try:
+            data = self.data_manager.load_file_streaming(file_path, ranking.insert, on_progress)
+        finally:
+            self._set_loading(False)
+            self.statusBar().clearMessage()
+        
+        return data["title"], ranking
+    
+    def _set_loading(self, loading):
+        """Block everything that could change the board or its file while a
+        load turns the event loop: the widgets, window shortcuts, the file
+        check and server poll timers, and closing the window"""
+        self._loading = loading
+        self.centralWidget().setEnabled(not loading)
+        for shortcut in self._window_shortcuts:
+            shortcut.setEnabled(not loading)
+        if loading:
+            self._paused_timers = [timer for timer in (self.file_check_timer, self.poll_timer)
+                                   if timer.isActive()]
+            for timer in self._paused_timers:
+                timer.stop()
+        else:
+            for timer in self._paused_timers:
+                timer.start()
+            self._paused_timers = []
+    
+    @perf.timed
     def refresh_display(self):
-        """Update the list with current entries"""
-        self.entries_list.clear()
-        
-        # Sort entries by value (desc) then by last_updated (asc for tiebreaking)
-        sorted_entries = sorted(self.entries, key=lambda x: (-x["value"], x["last_updated"]))
-        
-        # Add entries to list
-        selected_row = -1
-        for rank, entry in enumerate(sorted_entries, 1):
-            value_change_text = self._get_value_change_text(entry['name'], entry['value'])
-            text = f"#{rank:2d}  {entry['name']:<20} {entry['value']:3d} points{value_change_text}"
-            item = QListWidgetItem(text)
-            item.setData(Qt.UserRole, entry['name'])  # Store the entry name
-            self.entries_list.addItem(item)
-            
-            # Check if this is the previously selected entry
-            if self.selected_entry_name == entry['name']:
-                selected_row = rank - 1
+        """Show the current ranking, e.g. after loading a file"""
+        if self.entries_model.ranking is not self.ranking:
+            self.entries_model.set_ranking(self.ranking)
+        else:
+            self.entries_model.refresh_all()
         
         # Restore selection to follow the entry
-        if selected_row >= 0:
-            self.entries_list.setCurrentRow(selected_row)
+        index = self.entries_model.index_of(self.selected_entry_name) if self.selected_entry_name else None
+        if index is not None and index.isValid():
+            self.entries_list.setCurrentIndex(index)
+        else:
+            self.entries_list.clearSelection()
+    
+    def _name_index(self):
+        """The prefix index of the current ranking, kept up to date by the ranking itself"""
+        if self.name_index is None or self.name_index.ranking is not self.ranking:
+            if self.name_index is not None:
+                self.name_index.detach()
+            self.name_index = NameIndex(self.ranking)
+        return self.name_index
+    
+    def _select_entry(self, name):
+        """Select an entry and scroll it into view"""
+        index = self.entries_model.index_of(name)
+        if index.isValid():
+            self.entries_list.setCurrentIndex(index)
+            self.entries_list.scrollTo(index)
+    
+    def on_find_edited(self, text):
+        """Jump to the best ranked entry whose name starts with the typed text"""
+        prefix = text.strip()
+        if not prefix:
+            self._search_matches = []
+            self.find_status.clear()
+            return
+        
+        self._search_matches, self._search_total = self._name_index().matches(prefix, SEARCH_MATCHES)
+        self._search_position = 0
+        if not self._search_matches:
+            self.find_status.setText("No matches")
+            return
+        self._select_entry(self._search_matches[0])
+        self._show_find_position()
+    
+    def next_find_match(self):
+        """Step to the next match, wrapping around after the last one"""
+        # Entries removed or renamed since typing are skipped
+        for _ in range(len(self._search_matches)):
+            self._search_position = (self._search_position + 1) % len(self._search_matches)
+            name = self._search_matches[self._search_position]
+            if name in self.ranking:
+                self._select_entry(name)
+                self._show_find_position()
+                return
+    
+    def _show_find_position(self):
+        position = self._search_position + 1
+        if self._search_total > len(self._search_matches):
+            self.find_status.setText(f"{position} of {self._search_total} (top {len(self._search_matches)})")
+        else:
+            self.find_status.setText(f"{position} of {self._search_total}")
     
     def on_title_changed(self, text):
         """Handle title changes"""
         self.title = text
     
-    def on_item_selected(self, item):
+    def on_title_edited(self):
+        """Record the title once the user finishes editing it"""
+        if self.title != self.committed_title:
+            self._record_undo((oplog.TITLE, self.committed_title, self.title))
+            self.committed_title = self.title
+            self._journal([journal.TITLE, self.title])
+    
+    def _journal(self, *records):
+        """Record mutations: sent to the server when attached, else appended to
+        the current file's journal when journal mode is on"""
+        if self.client is not None:
+            self._send_to_server(records)
+            return
+        if not self.current_file_path:
+            return
+        self._journal_synced = False
+        if not self.journal_check.isChecked():
+            self._unjournaled = True
+            return
+        try:
+            for record in records:
+                self.data_manager.append_journal(self.current_file_path, record)
+        except Exception as e:
+            self._unjournaled = True
+            QMessageBox.critical(self, "Error Writing Journal", f"Failed to journal change:\n{str(e)}")
+    
+    def _on_journal_toggled(self, checked):
+        """Remember the journal mode; changes made before it was on are not
+        in the journal, so the next Update writes the whole file"""
+        self.settings.set_journal_mode(checked)
+        if checked and self._has_unsaved_changes():
+            self._unjournaled = True
+    
+    # Undo and redo
+    def _record_undo(self, *records):
+        """Remember a change made here so it can be undone; attached to a
+        server, changes are stamped by the server and cannot be undone exactly"""
+        if self.client is None:
+            self.undo_log.record(*records)
+        self._update_undo_buttons()
+    
+    def _update_undo_buttons(self):
+        self.undo_btn.setEnabled(self.undo_log.can_undo())
+        self.redo_btn.setEnabled(self.undo_log.can_redo())
+    
+    def undo(self):
+        """Undo the last change, restoring exact values and timestamps"""
+        records = self.undo_log.peek_undo()
+        if records is not None and self._apply_undo_records(records):
+            self.undo_log.undone()
+        self._update_undo_buttons()
+    
+    def redo(self):
+        """Make the last undone change again"""
+        records = self.undo_log.peek_redo()
+        if records is not None and self._apply_undo_records(records):
+            self.undo_log.redone()
+        self._update_undo_buttons()
+    
+    def _apply_undo_records(self, records):
+        """Apply undo log records through the model and journal them"""
+        # A merge from the file may have changed the same entries since
+        if not all(oplog.applies_to(record, self.ranking, self.title) for record in records):
+            self.undo_log.clear()
+            self.statusBar().showMessage("The board changed elsewhere, so there is nothing left to undo", 5000)
+            return False
+        
+        journal_records = []
+        changed_name = None
+        for record in records:
+            kind = record[0]
+            if kind == oplog.ADD:
+                _, name, value, last_updated = record
+                self.entries_model.add_entry(name, value, last_updated)
+                journal_records.append([journal.ADD, name, value, last_updated])
+                changed_name = name
+            elif kind == oplog.REMOVE:
+                name = record[1]
+                self.entries_model.remove_entry(name)
+                journal_records.append([journal.REMOVE, name])
+                if self.selected_entry_name == name:
+                    self.selected_entry_name = None
+            elif kind == oplog.SET:
+                _, name, old_value, _, value, last_updated = record
+                self.entries_model.set_value(name, value, last_updated)
+                journal_records.append([journal.DELTA, name, value - old_value, last_updated])
+                changed_name = name
+            elif kind == oplog.RENAME:
+                _, old_name, name = record
+                self.entries_model.rename(old_name, name)
+                journal_records.append([journal.RENAME, old_name, name])
+                if self.selected_entry_name == old_name:
+                    self.selected_entry_name = name
+                changed_name = name
+            elif kind == oplog.TITLE:
+                self.title_edit.setText(record[2])
+                self.committed_title = self.title
+                journal_records.append([journal.TITLE, self.title])
+        self._journal(*journal_records)
+        
+        # Show the entry a single change was about
+        if len(records) == 1 and changed_name is not None:
+            self._select_entry(changed_name)
+        return True
+    
+    def _close_journal(self):
+        """Release the journal of the file being closed"""
+        if self.current_file_path:
+            self.data_manager.close_journal(self.current_file_path)
+    
+    def on_item_selected(self, index, previous=None):
         """Handle item selection"""
-        self.selected_entry_name = item.data(Qt.UserRole)
+        if index.isValid():
+            self.selected_entry_name = index.data(NameRole)
         
     def add_entry(self):
         """Add a new entry"""
@@ -195,48 +600,83 @@ class PyQtTallyApp(QMainWindow):
             return
             
         # Check for duplicate names
-        if any(entry["name"] == name for entry in self.entries):
+        if name in self.ranking:
             QMessageBox.warning(self, "Duplicate Name", f"Entry '{name}' already exists!")
             return
         
-        self.entries.append({
-            "name": name,
-            "value": 0,
-            "last_updated": time.time()
-        })
+        timestamp = time.time()
+        self.entries_model.add_entry(name, 0, timestamp)
+        self._journal([journal.ADD, name, 0, timestamp])
+        self._record_undo((oplog.ADD, name, 0, timestamp))
         self.add_edit.clear()
         self.selected_entry_name = None
-        self.refresh_display()
+        self.entries_list.clearSelection()
     
     def increment_selected(self):
         """Increment the selected entry"""
-        if not self.selected_entry_name:
-            QMessageBox.information(self, "No Selection", "Please select an entry first")
-            return
-        
-        # Find and update the entry
-        for entry in self.entries:
-            if entry["name"] == self.selected_entry_name:
-                entry["value"] += 1
-                entry["last_updated"] = time.time()
-                break
-        
-        self.refresh_display()
+        self._adjust_selected(1)
     
     def decrement_selected(self):
         """Decrement the selected entry"""
+        self._adjust_selected(-1)
+    
+    def add_step_to_selected(self):
+        """Add N points to the selected entry"""
+        self._adjust_selected(self.step_spin.value())
+    
+    def _adjust_selected(self, delta):
         if not self.selected_entry_name:
             QMessageBox.information(self, "No Selection", "Please select an entry first")
             return
         
-        # Find and update the entry
-        for entry in self.entries:
-            if entry["name"] == self.selected_entry_name:
-                entry["value"] -= 1
-                entry["last_updated"] = time.time()
-                break
+        # Update the entry now; its row moves with the next frame
+        entry = self.ranking.get(self.selected_entry_name)
+        if entry is not None:
+            before = (entry.value, entry.last_updated)
+            timestamp = time.time()
+            self.update_scheduler.defer()
+            self.entries_model.adjust(entry.name, delta, timestamp)
+            self._journal([journal.DELTA, entry.name, delta, timestamp])
+            self._record_undo((oplog.SET, entry.name) + before + (entry.value, entry.last_updated))
+    
+    def import_scores(self):
+        """Apply a file of (name, delta, timestamp) scoring events in one pass"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Import Scores",
+            "",
+            "Score Events (*.csv *.jsonl);;All Files (*)"
+        )
+        
+        if not file_path:
+            return
+        
+        try:
+            from core.bulk_import import aggregate_events, read_events
+            changes = aggregate_events(read_events(file_path))
+        except Exception as e:
+            QMessageBox.critical(self, "Error Importing Scores", f"Failed to import scores:\n{str(e)}")
+            return
         
+        before = {name: self.ranking.get(name) for name in changes}
+        before = {name: (entry.value, entry.last_updated) for name, entry in before.items()
+                  if entry is not None}
+        added = set(self.entries_model.apply_bulk(changes))
+        self._journal(*[[journal.ADD if name in added else journal.DELTA, name, delta, last_updated]
+                        for name, (delta, last_updated) in changes.items()])
+        # The whole import is one undo step
+        undo_records = []
+        for name in changes:
+            entry = self.ranking.get(name)
+            if name in added:
+                undo_records.append((oplog.ADD, name, entry.value, entry.last_updated))
+            else:
+                undo_records.append((oplog.SET, name) + before[name] + (entry.value, entry.last_updated))
+        self._record_undo(*undo_records)
         self.refresh_display()
+        
+        QMessageBox.information(self, "Imported", f"Updated {len(changes) - len(added)} entries "
+                                                  f"and added {len(added)} from {os.path.basename(file_path)}")
     
     def edit_selected_name(self):
         """Edit the name of the selected entry"""
@@ -245,18 +685,14 @@ class PyQtTallyApp(QMainWindow):
             return
         
         # Find the selected entry
-        selected_entry = None
-        for entry in self.entries:
-            if entry["name"] == self.selected_entry_name:
-                selected_entry = entry
-                break
+        selected_entry = self.ranking.get(self.selected_entry_name)
         
         if not selected_entry:
             return
         
         new_name, ok = QInputDialog.getText(self, "Edit Name", 
-                                           f"Enter new name for '{selected_entry['name']}':", 
-                                           text=selected_entry['name'])
+                                           f"Enter new name for '{selected_entry.name}':", 
+                                           text=selected_entry.name)
         
         if not ok or not new_name.strip():
             return
@@ -264,15 +700,18 @@ class PyQtTallyApp(QMainWindow):
         new_name = new_name.strip()
         
         # Check for duplicates
-        if any(e["name"] == new_name for e in self.entries if e["name"] != selected_entry["name"]):
+        if new_name != selected_entry.name and new_name in self.ranking:
             QMessageBox.warning(self, "Duplicate Name", f"Entry '{new_name}' already exists!")
             return
         
         # Update the entry and selected name
-        selected_entry["name"] = new_name
+        old_name = selected_entry.name
+        if new_name == old_name:
+            return
         self.selected_entry_name = new_name  # Update our tracking
-        
-        self.refresh_display()
+        self.entries_model.rename(old_name, new_name)
+        self._journal([journal.RENAME, old_name, new_name])
+        self._record_undo((oplog.RENAME, old_name, new_name))
     
     # File operations
     def load_file(self):
@@ -281,36 +720,55 @@ class PyQtTallyApp(QMainWindow):
             self, 
             "Load Tally File", 
             "", 
-            "JSON Files (*.json);;All Files (*)"
+            TALLY_FILE_FILTER
         )
         
         if not file_path:
             return
         
         try:
-            data = self.data_manager.load_file(file_path)
-            
+            self.open_board(file_path)
+            QMessageBox.information(self, "Success", f"Loaded file: {os.path.basename(file_path)}")
+        except Exception as e:
+            QMessageBox.critical(self, "Error Loading File", f"Failed to load file:\n{str(e)}")
+    
+    def open_board(self, file_path):
+        """Show a file, from the workspace cache when it is still current"""
+        self._detach_server()
+        if self.current_file_path and os.path.abspath(file_path) == os.path.abspath(self.current_file_path):
+            return
+        
+        board = self.workspace.get(file_path)
+        if board is None:
+            # Cold board: parse, validate and rank it; the current board stays up meanwhile
+            title, ranking = self._stream_file(file_path)
+        
+        self._stash_board()
+        if board is not None:
+            # The board on screen is not part of the cache
+            self.workspace.discard(file_path)
+            self._restore_board(board)
+        else:
             # Load the data into the UI
-            self.title = data["title"]
-            self.entries = data["entries"]
+            self.title = title
+            self.committed_title = self.title
+            self.ranking = ranking
             self.current_file_path = file_path
+            self._watch_current_file()
             self.selected_entry_name = None
-            
-            # Save as last opened file
-            self.settings.set_last_file(file_path)
+            self._revalidate_all = False
             
             # Update UI
             self.title_edit.setText(self.title)
             self.refresh_display()
             self.update_window_title()
             
-            # Capture initial positions and values as baseline
-            self._capture_current_state()
-            
-            QMessageBox.information(self, "Success", f"Loaded file: {os.path.basename(file_path)}")
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Error Loading File", f"Failed to load file:\n{str(e)}")
+            # Start change tracking from the loaded state
+            self._reset_baselines()
+        
+        # Save as last opened file
+        self.settings.set_last_file(file_path)
+        self._add_open_file(file_path)
         
     def new_file(self):
         """Create a new empty tally file"""
@@ -319,33 +777,41 @@ class PyQtTallyApp(QMainWindow):
             self,
             "Create New Tally File",
             "new_tally.json",
-            "JSON Files (*.json);;All Files (*)"
+            TALLY_FILE_FILTER
         )
         
         if not file_path:
             return
             
-        if not file_path.endswith('.json'):
+        if not file_path.endswith(('.json', columnar.SUFFIX, sqlite_store.SUFFIX)):
             file_path += '.json'
         
+        self._detach_server()
+        self._stash_board()
+        
         # Reset to empty state
         self.title = "New Tally List"
-        self.entries = []
+        self.committed_title = self.title
+        self.ranking = Ranking()
         self.selected_entry_name = None
+        self._close_journal()
         self.current_file_path = file_path
         
         # Save the empty file
         try:
-            self.data_manager.save_file(file_path, self.title, self.entries)
+            signature = self.data_manager.save_file(file_path, self.title, self.ranking.to_list())
+            self._watch_current_file(signature)
             self.settings.set_last_file(file_path)
+            self.workspace.discard(file_path)
+            self._add_open_file(file_path)
             
             # Update UI
             self.title_edit.setText(self.title)
             self.refresh_display()
             self.update_window_title()
             
-            # Capture initial positions and values as baseline
-            self._capture_current_state()
+            # Start change tracking from the empty state
+            self._reset_baselines()
             
             QMessageBox.information(self, "Success", f"Created new file: {os.path.basename(file_path)}")
         except Exception as e:
@@ -353,23 +819,447 @@ class PyQtTallyApp(QMainWindow):
         
     def update_file(self):
         """Update/save current tally data to the current file"""
+        if self.client is not None:
+            self._commit_on_server()
+            return
+        
         if not self.current_file_path:
             QMessageBox.warning(self, "No File", "No file is currently open. Use 'New File' to create one or 'Load File' to open an existing file.")
             return
         
+        if not self.journal_check.isChecked():
+            self._request_background_save()
+            return
+        
         try:
-            self.data_manager.save_file(self.current_file_path, self.title, self.entries)
+            self.on_title_edited()
+            if self._unjournaled:
+                # Some changes never reached the journal; write them all out
+                signature = self.data_manager.save_file(
+                    self.current_file_path, self.title, self.ranking.to_list(),
+                    self._changes_to_validate())
+                self._unjournaled = False
+            else:
+                # Changes are already journaled; just make them durable;
+                # a signature means the journal was folded into the file
+                signature = self.data_manager.checkpoint(
+                    self.current_file_path, self.title, self.ranking.to_list(),
+                    self._changes_to_validate())
+            self.committed_title = self.title
+            self.synced_title = self.title
+            # Changes only synced in the journal stay changed until a save
+            # writes them into the file itself
+            if signature is not None:
+                self.ranking.clear_changes()
+                if self.file_watcher is not None:
+                    self.file_watcher.acknowledge(signature)
+            self._journal_synced = True
             
             # Capture current state as new baseline after successful save
             self._capture_current_state()
             
             QMessageBox.information(self, "Updated", f"Updated file: {os.path.basename(self.current_file_path)}")
         except Exception as e:
+            self._revalidate_all = True
             QMessageBox.critical(self, "Error Updating File", f"Failed to update file:\n{str(e)}")
     
+    def _changes_to_validate(self):
+        """Entry names the next save must re-validate, or None for all of them"""
+        if self._revalidate_all:
+            self._revalidate_all = False
+            return None
+        return self.ranking.changed_names()
+    
+    def _request_background_save(self):
+        """Snapshot the current state and hand it to the background saver"""
+        self._save_token += 1
+        snapshot = self.ranking.to_list()
+        # The snapshot becomes the new baseline once it is on disk
+        baseline = self.history.mark(f"{_PENDING_SAVE}{self._save_token}")
+        self._pending_saves[self._save_token] = (self.current_file_path, self.history, baseline,
+                                                 self.title)
+        self.saver.request_save(self._save_token, self.current_file_path, self.title,
+                                snapshot, self._changes_to_validate())
+        self.committed_title = self.title
+        self._unjournaled = False
+        self.ranking.clear_changes()
+        self.statusBar().showMessage(f"Saving {os.path.basename(self.current_file_path)}...")
+    
+    def _finish_pending_saves(self, token):
+        """Forget a finished request and any older ones for the same file it was
+        coalesced with"""
+        request = self._pending_saves.get(token)
+        if request is None:
+            return None
+        key = os.path.abspath(request[0])
+        for pending in [t for t, (path, *_) in self._pending_saves.items()
+                        if t <= token and os.path.abspath(path) == key]:
+            _, history, baseline, _ = self._pending_saves.pop(pending)
+            if pending != token:
+                history.discard(baseline.label)
+        return request
+    
+    def _on_save_finished(self, token, signature):
+        """Make the saved snapshot the new change baseline"""
+        request = self._finish_pending_saves(token)
+        if request is None:
+            return
+        file_path, history, baseline, title = request
+        if history.get(baseline.label) is baseline:
+            history.rename(baseline.label, LAST_UPDATE)
+            if history is self.history:
+                self._on_baselines_changed()
+        if history is self.history:
+            if self.file_watcher is not None:
+                # Our own write is not an external change
+                self.file_watcher.acknowledge(signature)
+            self.synced_title = title
+        else:
+            self._on_board_saved(file_path, history, title, signature)
+        self.statusBar().showMessage(f"Updated file: {os.path.basename(file_path)}", 5000)
+    
+    def _on_save_failed(self, token, message):
+        """Report a failed background save"""
+        request = self._finish_pending_saves(token)
+        if request is not None:
+            file_path, history, baseline, _ = request
+            history.discard(baseline.label)
+            board = self.workspace.peek(file_path)
+            if history is not self.history and board is not None and board.extras["history"] is history:
+                board.dirty = True
+                board.extras["revalidate_all"] = True
+                board.extras["unjournaled"] = True
+            else:
+                self._revalidate_all = True
+                self._unjournaled = True
+        self.statusBar().clearMessage()
+        QMessageBox.critical(self, "Error Updating File", f"Failed to update file:\n{message}")
+    
+    def closeEvent(self, event):
+        """Let queued saves finish before the window goes away"""
+        if self._loading:
+            event.ignore()
+            return
+        self._detach_server()
+        self.saver.close()
+        super().closeEvent(event)
+    
+    def show_perf_panel(self):
+        """Open the timings panel and start recording"""
+        if self.perf_panel is None:
+            from ui.perf_panel import PerfPanel
+            self.perf_panel = PerfPanel(self)
+        self.perf_panel.enabled_check.setChecked(True)
+        self.perf_panel.show()
+        self.perf_panel.raise_()
+    
+    # Workspace
+    def _add_open_file(self, file_path):
+        """List a file in the board switcher and remember it for next time"""
+        if not any(os.path.abspath(path) == os.path.abspath(file_path) for path in self.open_files):
+            self.open_files.append(file_path)
+            self.settings.set_open_files(self.open_files)
+        self._refresh_board_combo()
+    
+    def _refresh_board_combo(self):
+        """Show the open files in the switcher with the current one selected"""
+        self.board_combo.clear()
+        for path in self.open_files:
+            self.board_combo.addItem(os.path.basename(path), path)
+            self.board_combo.setItemData(self.board_combo.count() - 1, path, Qt.ToolTipRole)
+        current = -1
+        if self.current_file_path and self.client is None:
+            for i, path in enumerate(self.open_files):
+                if os.path.abspath(path) == os.path.abspath(self.current_file_path):
+                    current = i
+        self.board_combo.setCurrentIndex(current)
+    
+    def _has_unsaved_changes(self):
+        """Whether the current board has changes that are not in its file yet"""
+        return ((bool(self.ranking.changed_names()) and not self._journal_synced)
+                or self.title != self.synced_title
+                or any(path == self.current_file_path for path, _, _, _ in self._pending_saves.values()))
+    
+    def _stash_board(self):
+        """Keep the current board in the workspace so switching back is instant"""
+        if self.client is not None or not self.current_file_path:
+            return
+        self._close_journal()
+        # Cached dump lines grow with the list but are not part of the board's
+        # memory estimate; they are rebuilt on the next dump
+        self.dump_renderer.clear()
+        self.workspace.put(Board(
+            self.current_file_path, self.title, self.ranking,
+            signature=self.file_watcher.signature if self.file_watcher else None,
+            dirty=self._has_unsaved_changes(),
+            extras={
+                "committed_title": self.committed_title,
+                "synced_title": self.synced_title,
+                "history": self.history,
+                "dump_renderer": self.dump_renderer,
+                "baseline_label": self.baseline_label,
+                "selected_entry_name": self.selected_entry_name,
+                "file_watcher": self.file_watcher,
+                "revalidate_all": self._revalidate_all,
+                "unjournaled": self._unjournaled,
+                "journal_synced": self._journal_synced,
+                "undo_log": self.undo_log,
+            }))
+        # The board keeps its history following its ranking
+        self.history = None
+    
+    def _restore_board(self, board):
+        """Show a board from the workspace with its baselines and selection"""
+        extras = board.extras
+        self.current_file_path = board.path
+        self.title = board.title
+        self.ranking = board.ranking
+        self.committed_title = extras["committed_title"]
+        self.history = extras["history"]
+        self.dump_renderer = extras["dump_renderer"]
+        self.baseline_label = extras["baseline_label"]
+        self.selected_entry_name = extras["selected_entry_name"]
+        self.file_watcher = extras["file_watcher"]
+        self._revalidate_all = extras["revalidate_all"]
+        self._unjournaled = extras["unjournaled"]
+        self._journal_synced = extras["journal_synced"]
+        self.undo_log = extras["undo_log"]
+        self._update_undo_buttons()
+        self.title_edit.setText(self.title)
+        self.synced_title = extras["synced_title"]
+        self.refresh_display()
+        self.update_window_title()
+        self._on_baselines_changed()
+    
+    def _on_board_saved(self, file_path, history, title, signature):
+        """A save of a board in the background workspace finished"""
+        board = self.workspace.peek(file_path)
+        if board is None or board.extras["history"] is not history:
+            return
+        watcher = board.extras["file_watcher"]
+        watcher.acknowledge(signature)
+        board.signature = watcher.signature
+        board.extras["synced_title"] = title
+        board.dirty = (bool(board.ranking.changed_names()) or board.title != title
+                       or any(path == file_path for path, _, _, _ in self._pending_saves.values()))
+        self.workspace.evict()
+    
+    def on_board_selected(self, index):
+        """Switch to another open file"""
+        file_path = self.board_combo.itemData(index)
+        if not file_path:
+            return
+        try:
+            self.open_board(file_path)
+        except Exception as e:
+            QMessageBox.critical(self, "Error Loading File", f"Failed to load file:\n{str(e)}")
+            self._refresh_board_combo()
+    
+    def close_board(self):
+        """Take the current file out of the workspace and show another one"""
+        if not self.current_file_path or self.client is not None:
+            return
+        if self._has_unsaved_changes():
+            answer = QMessageBox.question(self, "Unsaved Changes",
+                                          "This board has changes that are not saved. Close it anyway?")
+            if answer != QMessageBox.Yes:
+                return
+        
+        closing = os.path.abspath(self.current_file_path)
+        self.workspace.discard(closing)
+        self.open_files = [path for path in self.open_files if os.path.abspath(path) != closing]
+        self.settings.set_open_files(self.open_files)
+        self._close_journal()
+        self.current_file_path = None
+        
+        for path in reversed(self.open_files):
+            try:
+                self.open_board(path)
+                return
+            except Exception:
+                continue
+        
+        # Nothing else open: start empty
+        self.settings.set_last_file(None)
+        self.load_last_file_or_start_empty()
+    
+    # Changes made elsewhere
+    def _watch_current_file(self, signature=None):
+        """Start watching the current file as it is now, or as it was at
+        `signature` when that is what we wrote ourselves"""
+        self.file_watcher = (FileWatcher(self.current_file_path, signature)
+                             if self.current_file_path else None)
+        self.synced_title = self.title
+    
+    def check_external_changes(self):
+        """Merge in changes someone else saved to the open file"""
+        # Our own pending saves would look like external changes
+        if (self.file_watcher is None or self._pending_saves
+                or not self.centralWidget().isEnabled() or not self.file_watcher.check()):
+            return
+        
+        try:
+            # Our own journal holds local changes, not the file's; merge
+            # against the snapshot someone else wrote
+            data = self.data_manager.load_file(self.current_file_path, replay_journal=False)
+        except Exception as e:
+            # Probably still being written or synced; try again on the next check
+            self.file_watcher.invalidate()
+            self.statusBar().showMessage(f"Could not read external changes: {e}", FILE_CHECK_INTERVAL)
+            return
+        
+        plan = plan_merge(self.ranking, data["entries"], self.history.get(LAST_UPDATE))
+        for name in plan.removed:
+            self.entries_model.remove_entry(name)
+        for name, value, last_updated in plan.updated:
+            self.entries_model.set_value(name, value, last_updated)
+        for entry in plan.added:
+            self.entries_model.add_entry(entry["name"], entry["value"], entry["last_updated"])
+        
+        if data["title"] != self.synced_title and self.title == self.synced_title:
+            self.title_edit.setText(data["title"])
+            self.committed_title = data["title"]
+        self.synced_title = data["title"]
+        if self.selected_entry_name not in self.ranking:
+            self.selected_entry_name = None
+        
+        # "Last update" is now the file as it is on disk
+        self.history.mark_from_entries(LAST_UPDATE, data["entries"])
+        if os.path.exists(journal.journal_path(self.current_file_path)):
+            # The journal was written against the old snapshot, so the next
+            # Update folds it into a full save
+            self._unjournaled = True
+        self._on_baselines_changed()
+        self.statusBar().showMessage(
+            f"Merged changes from {os.path.basename(self.current_file_path)}: "
+            f"{len(plan.updated)} updated, {len(plan.added)} added, {len(plan.removed)} removed", 5000)
+    
+    # Scoring server
+    def attach_server(self):
+        """Score on a board shared through 'tally serve' instead of a local file"""
+        url, ok = QInputDialog.getText(self, "Attach Server", "Server address:",
+                                       text=self.settings.get_server_url())
+        if not ok or not url.strip():
+            return
+        
+        try:
+            # http.client is slow to import and only needed once attaching
+            from server.tally_client import TallyClient
+            client = TallyClient(url.strip(), timeout=SERVER_TIMEOUT)
+            # The user waits for this one; everything after it goes through the link
+            state = client.state()
+        except (ValueError, RuntimeError) as e:
+            QMessageBox.critical(self, "Error Attaching Server", f"Failed to attach:\n{str(e)}")
+            return
+        
+        self._detach_server()
+        self._stash_board()
+        self._close_journal()
+        self.settings.set_server_url(client.url)
+        self.client = ServerLink(client, self)
+        self.client.finished.connect(self._on_server_finished)
+        self.client.failed.connect(self._on_server_failed)
+        self.current_file_path = None
+        self._watch_current_file()
+        self.journal_check.setEnabled(False)
+        
+        self.title = state["title"]
+        self.committed_title = self.title
+        self.ranking = Ranking(state["entries"])
+        self.server_version = state["version"]
+        self.selected_entry_name = None
+        self.title_edit.setText(self.title)
+        self.refresh_display()
+        self.update_window_title()
+        self._reset_baselines()
+        self._refresh_board_combo()
+        self.poll_timer.start()
+        self.statusBar().showMessage(f"Attached to {client.url}", 5000)
+    
+    def _detach_server(self):
+        """Stop following the scoring server; the board stays on screen"""
+        if self.client is None:
+            return
+        self.poll_timer.stop()
+        self.client.close()
+        self.client = None
+        self.server_version = None
+        self.journal_check.setEnabled(True)
+        self.update_window_title()
+    
+    def _send_to_server(self, records):
+        """Forward local changes; the next poll brings the server's timestamps"""
+        self.client.request("send", list(records))
+    
+    def _poll_server(self):
+        """Ask for what changed on the server since the last poll, unless the
+        last poll has not come back yet"""
+        if (self.client is None or not self.centralWidget().isEnabled()
+                or self.client.is_pending("changes")):
+            return
+        self.client.request("changes", self.server_version)
+    
+    def _on_server_finished(self, kind, result):
+        """A request to the server came back"""
+        if self.sender() is not self.client:
+            return  # From a link that was detached meanwhile
+        if kind == "changes":
+            self._apply_server_changes(result)
+        elif kind == "commit":
+            self._capture_current_state()
+            self.statusBar().showMessage(f"Committed on {self.client.url}", 5000)
+    
+    def _on_server_failed(self, kind, message):
+        """A request to the server failed or was rejected"""
+        if self.sender() is not self.client:
+            return
+        if kind == "send":
+            # Local state may have diverged, so start over from the server's
+            self.server_version = None
+            self.statusBar().showMessage(f"Server did not take the change: {message}", 5000)
+        elif kind == "commit":
+            QMessageBox.critical(self, "Error Updating File", f"Failed to commit on server:\n{message}")
+        else:
+            self.statusBar().showMessage(message, 2 * SERVER_POLL_INTERVAL)
+    
+    def _apply_server_changes(self, changes):
+        """Apply what changed on the server since the last poll"""
+        if changes["reset"]:
+            self.ranking.load(changes["entries"])
+            self.entries_model.set_ranking(self.ranking)
+            self.refresh_display()
+        else:
+            # Everyone's increments since the last poll show up as one redraw
+            self.update_scheduler.defer()
+            for name in changes["removed"]:
+                if name in self.ranking:
+                    self.entries_model.remove_entry(name)
+            for entry in changes["entries"]:
+                current = self.ranking.get(entry["name"])
+                if current is None:
+                    self.entries_model.add_entry(entry["name"], entry["value"], entry["last_updated"])
+                elif (current.value, current.last_updated) != (entry["value"], entry["last_updated"]):
+                    self.entries_model.set_value(entry["name"], entry["value"], entry["last_updated"])
+        
+        if self.selected_entry_name not in self.ranking:
+            self.selected_entry_name = None
+        if changes["title"] != self.committed_title and not self.title_edit.hasFocus():
+            self.committed_title = changes["title"]
+            self.title_edit.setText(changes["title"])
+        self.server_version = changes["version"]
+    
+    def _commit_on_server(self):
+        """Update while attached: have the server write its file now, after
+        the changes already sent"""
+        self.on_title_edited()
+        self.client.request("commit")
+        self.statusBar().showMessage(f"Committing on {self.client.url}...")
+    
     def update_window_title(self):
         """Update the window title to show current file"""
-        if self.current_file_path:
+        if self.client is not None:
+            self.setWindowTitle(f"Tally - {self.client.url}")
+        elif self.current_file_path:
             filename = os.path.basename(self.current_file_path)
             self.setWindowTitle(f"Tally - {filename}")
         else:
@@ -385,67 +1275,132 @@ class PyQtTallyApp(QMainWindow):
         
         
         # Show confirmation
-        lines_count = len(self.entries)
+        lines_count = sum(1 for line in dump_text.splitlines()[3:] if line != "(No entries)")
         QMessageBox.information(self, "Copied", f"Copied {lines_count} entries to clipboard")
     
-    def generate_simple_dump(self) -> str:
-        """Generate a simple human-readable dump of the current state"""
-        if not self.entries:
-            return f"{self.title}\n(No entries)"
-        
-        # Sort entries the same way as the display
-        sorted_entries = sorted(self.entries, key=lambda x: (-x["value"], x["last_updated"]))
-        
-        lines = [self.title, "=" * len(self.title), ""]
+    def save_simple_dump(self):
+        """Write the simple dump to a text file line by line"""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save Dump",
+            "dump.txt",
+            "Text Files (*.txt);;All Files (*)"
+        )
         
-        for rank, entry in enumerate(sorted_entries, 1):
-            change_indicator = self._get_position_change_indicator(entry['name'], rank)
-            value_change_text = self._get_value_change_text(entry['name'], entry['value'])
-            line = f"{rank:2d} {change_indicator} {entry['name']:<20} {entry['value']:3d} points{value_change_text}"
-            lines.append(line)
+        if not file_path:
+            return
         
-        return "\n".join(lines)
+        try:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                self.dump_renderer.write(f, self.title, self._active_baseline(), **self._dump_filters())
+        except Exception as e:
+            QMessageBox.critical(self, "Error Saving Dump", f"Failed to save dump:\n{str(e)}")
+    
+    def _dump_filters(self):
+        """Top-N and changed-only filters chosen in the window"""
+        return {
+            "top": self.dump_top_spin.value() or None,
+            "changed_only": self.dump_changed_check.isChecked()
+        }
+    
+    @perf.timed
+    def generate_simple_dump(self) -> str:
+        """Generate a simple human-readable dump of the current state"""
+        # Unchanged entries reuse their cached lines
+        return self.dump_renderer.render(self.title, self._active_baseline(), **self._dump_filters())
+    
+    def _active_baseline(self):
+        """The baseline change indicators compare against, if tracking has started"""
+        if self.history is None:
+            return None
+        return self.history.get(self.baseline_label) or self.history.get(LAST_UPDATE)
     
     def _get_position_change_indicator(self, name: str, current_position: int) -> str:
         """Get the position change indicator for an entry"""
-        if name not in self.previous_positions:
-            return "🌱 -"  # New entry
-        
-        previous_position = self.previous_positions[name]
-        
-        if current_position < previous_position:  # Position improved (lower number = better rank)
-            change = previous_position - current_position
-            return f"⬆️+{change}"
-        elif current_position > previous_position:  # Position declined
-            change = current_position - previous_position
-            return f"⬇️-{change}"
-        else:  # Position stayed the same
-            return "⚪ ="
+        baseline = self._active_baseline()
+        previous_position = baseline.previous_rank(name, current_position) if baseline else None
+        return position_change_indicator(previous_position, current_position)
     
     def _get_value_change_text(self, name: str, current_value: int) -> str:
         """Get the value change text for an entry"""
-        if name not in self.previous_values:
-            return ""  # New entry, no change to display
-        
-        previous_value = self.previous_values[name]
-        value_change = current_value - previous_value
-        
-        if value_change > 0:
-            return f" (+{value_change})"
-        elif value_change < 0:
-            return f" ({value_change})"
-        else:
-            return ""  # No change, don't display anything
+        baseline = self._active_baseline()
+        # Rows of a ranking that is still loading have no baseline yet
+        if baseline is None or self.history.ranking is not self.entries_model.ranking:
+            return ""
+        return value_change_text(baseline.previous_value(name), current_value)
+    
+    def _reset_baselines(self):
+        """Start change tracking over for a newly loaded ranking"""
+        if self.history is not None:
+            self.history.detach()
+        self.dump_renderer.detach()
+        self.history = History(self.ranking)
+        self.dump_renderer = DumpRenderer(self.ranking)
+        self.history.mark(SINCE_OPENED)
+        self.history.mark(LAST_UPDATE)
+        self._on_baselines_changed()
+        self.undo_log = oplog.OpLog()
+        self._update_undo_buttons()
+        self._unjournaled = False
+        self._journal_synced = False
     
     def _capture_current_state(self):
-        """Capture current positions and values as previous state for next comparison"""
-        sorted_entries = sorted(self.entries, key=lambda x: (-x["value"], x["last_updated"]))
-        self.previous_positions = {}
-        self.previous_values = {}
-        for rank, entry in enumerate(sorted_entries, 1):
-            self.previous_positions[entry['name']] = rank
-            self.previous_values[entry['name']] = entry['value']
+        """Make the current state the baseline for the next comparison"""
+        self.history.mark(LAST_UPDATE)
+        self._on_baselines_changed()
     
+    def _on_baselines_changed(self):
+        """Refresh the baseline choices and the change text that depends on them"""
+        labels = [label for label in self.history.labels() if not label.startswith(_PENDING_SAVE)]
+        if self.baseline_label not in labels:
+            self.baseline_label = LAST_UPDATE
+        self.baseline_combo.clear()
+        self.baseline_combo.addItems(labels)
+        self.baseline_combo.setCurrentText(self.baseline_label)
+        
+        # Value change text in the list is relative to the active baseline
+        self.entries_model.refresh_all()
+    
+    def on_baseline_selected(self, label):
+        """Compare against a different baseline"""
+        self.baseline_label = label
+        self.entries_model.refresh_all()
+    
+    def mark_baseline(self):
+        """Keep the current state as a named baseline, e.g. the start of the night"""
+        label, ok = QInputDialog.getText(self, "Mark Baseline", "Name this baseline:",
+                                         text=time.strftime("Start of %a %d %b"))
+        if not ok or not label.strip():
+            return
+        label = label.strip()
+        if label.startswith(_PENDING_SAVE):
+            return
+        self.history.mark(label)
+        self.baseline_label = label
+        self._on_baselines_changed()
+    
+    def compare_with_file(self):
+        """Use another tally file, e.g. the start of the season, as a baseline"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Compare With File",
+            "",
+            TALLY_FILE_FILTER
+        )
+        
+        if not file_path:
+            return
+        
+        try:
+            data = self.data_manager.load_file(file_path)
+        except Exception as e:
+            QMessageBox.critical(self, "Error Loading File", f"Failed to load file:\n{str(e)}")
+            return
+        
+        label = os.path.basename(file_path)
+        self.history.mark_from_entries(label, data["entries"])
+        self.baseline_label = label
+        self._on_baselines_changed()
 
 
 def main():
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+import threading
+from collections import deque
+from typing import Deque, Tuple
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class ServerLink(QObject):
+    """Talks to a scoring server on a worker thread.
+
+    Requests ("changes", "send", "commit") run one at a time in the order
+    they were made, so a poll always sees the changes sent before it. The
+    TallyClient is only used on the worker, and results come back through Qt
+    signals, which are delivered on the thread that owns this object; a slow
+    or unreachable server never blocks the window.
+    """
+
+    finished = pyqtSignal(str, object)  # request kind, result
+    failed = pyqtSignal(str, str)       # request kind, error message
+
+    def __init__(self, client, parent=None):
+        super().__init__(parent)
+        self._client = client
+        self._condition = threading.Condition()
+        self._queue: Deque[Tuple] = deque()
+        self._running = None            # kind of the request in flight
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="tally-server-link", daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self) -> str:
+        return self._client.url
+
+    def request(self, kind: str, *args):
+        """Queue a call of the client method `kind` with `args`"""
+        with self._condition:
+            self._queue.append((kind, args))
+            self._condition.notify_all()
+
+    def is_pending(self, kind: str) -> bool:
+        """Whether a request of this kind is queued or in flight"""
+        with self._condition:
+            return self._running == kind or any(queued == kind for queued, _ in self._queue)
+
+    def close(self):
+        """Drop queued requests and stop once the one in flight returns"""
+        with self._condition:
+            self._closed = True
+            self._queue.clear()
+            self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue or self._closed)
+                if self._closed:
+                    break
+                kind, args = self._queue.popleft()
+                self._running = kind
+
+            try:
+                result = getattr(self._client, kind)(*args)
+                self.finished.emit(kind, result)
+            except (ValueError, RuntimeError) as e:
+                self.failed.emit(kind, str(e))
+            finally:
+                with self._condition:
+                    self._running = None
+        self._client.close()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from core import perf
+
+# One frame at 60 Hz, in ms
+FRAME_INTERVAL = 16
+
+
+class UpdateScheduler(QObject):
+    """Shows rapid score changes at most once per frame.
+
+    Changes made after defer() reach the ranking at once, so anything that
+    reads it sees the current scores, but the entry model batches them and
+    the list is laid out and repainted once when the frame timer fires,
+    however many changes arrived in between. Holding down a key therefore
+    never queues up relayouts behind the scores.
+    """
+
+    flushed = pyqtSignal()   # after a batch of changes was shown
+
+    def __init__(self, model, parent=None, interval: int = FRAME_INTERVAL):
+        super().__init__(parent)
+        self._model = model
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self.flush)
+
+    def defer(self):
+        """Batch the model's next changes until the end of the frame"""
+        self._model.begin_batch()
+        if not self._timer.isActive():
+            self._timer.start()
+        perf.count("UpdateScheduler.deferred")
+
+    def is_pending(self) -> bool:
+        return self._model.in_batch()
+
+    @perf.timed
+    def flush(self):
+        """Show the batched changes now"""
+        self._timer.stop()
+        if self._model.in_batch():
+            self._model.end_batch()
+            self.flushed.emit()
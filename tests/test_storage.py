@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Round trips and journal-then-save behaviour of every tally file format.
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src', 'cli'))
+import tally_cli
+from core import columnar, journal, sqlite_store
+from core.data_manager import DataManager
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', 'src', 'core', 'schema.json')
+
+FORMATS = [".json", ".tally", ".sqlite"]
+
+ENTRIES = [
+    {"name": "Alice", "value": 7, "last_updated": 1700000000.25},
+    {"name": "Bob", "value": 7, "last_updated": 1700000001},
+    {"name": "Zoë", "value": 0, "last_updated": 1700000002.5},
+]
+
+
+@pytest.fixture(params=FORMATS)
+def tally_path(request, tmp_path):
+    path = str(tmp_path / f"board{request.param}")
+    DataManager(SCHEMA_PATH).save_file(path, "Board", ENTRIES)
+    return path
+
+
+def tally(*args):
+    assert tally_cli.main([str(arg) for arg in args]) == 0
+
+
+def points(path):
+    """name -> value as a fresh load sees it, journal included"""
+    return {entry["name"]: entry["value"]
+            for entry in DataManager(SCHEMA_PATH).load_file(path)["entries"]}
+
+
+def test_round_trip(tally_path):
+    data = DataManager(SCHEMA_PATH).load_file(tally_path)
+    assert data == {"title": "Board", "entries": ENTRIES}
+    # Integer timestamps stay integers
+    assert type(data["entries"][1]["last_updated"]) is int
+
+
+def test_changed_entries_round_trip(tally_path):
+    data_manager = DataManager(SCHEMA_PATH)
+    entries = [dict(entry) for entry in ENTRIES]
+    entries[2]["value"] = 3
+    data_manager.save_file(tally_path, "Renamed", entries, ["Zoë"])
+    assert data_manager.load_file(tally_path) == {"title": "Renamed", "entries": entries}
+
+
+def test_journal_is_replayed_on_load(tally_path):
+    tally("inc", tally_path, "Alice", 5, "--journal")
+    assert os.path.exists(journal.journal_path(tally_path))
+    assert points(tally_path)["Alice"] == 12
+
+
+def test_plain_save_after_journal_keeps_journaled_points(tally_path):
+    tally("inc", tally_path, "Alice", 5, "--journal")
+    tally("inc", tally_path, "Bob")
+    assert not os.path.exists(journal.journal_path(tally_path))
+    assert points(tally_path) == {"Alice": 12, "Bob": 8, "Zoë": 0}
+
+
+def test_journaled_add_and_rename_survive_a_plain_save(tally_path):
+    tally("add", tally_path, "Carol", "--journal")
+    tally("rename", tally_path, "Bob", "Robert", "--journal")
+    tally("inc", tally_path, "Carol", 2)
+    assert points(tally_path) == {"Alice": 7, "Robert": 7, "Zoë": 0, "Carol": 2}
+
+
+def test_compaction_keeps_every_journaled_point(tally_path):
+    # A journal this small is compacted on the first checkpoint
+    data_manager = DataManager(SCHEMA_PATH, compact_bytes=1)
+    data = data_manager.load_file(tally_path)
+    entries = {entry["name"]: entry for entry in data["entries"]}
+    for name, delta in (("Alice", 5), ("Zoë", 4)):
+        entries[name]["value"] += delta
+        data_manager.append_journal(tally_path, [journal.DELTA, name, delta, 1700000100])
+    # Nothing is passed as changed, as after a journal sync or a replayed load
+    assert data_manager.checkpoint(tally_path, data["title"], list(entries.values()), [])
+    data_manager.close_journal(tally_path)
+    assert not os.path.exists(journal.journal_path(tally_path))
+    assert points(tally_path) == {"Alice": 12, "Bob": 7, "Zoë": 4}
+
+
+def test_checkpoint_below_the_limit_only_syncs_the_journal(tally_path):
+    tally("inc", tally_path, "Zoë", 1, "--journal")
+    tally("inc", tally_path, "Zoë", 1, "--journal")
+    assert os.path.exists(journal.journal_path(tally_path))
+    assert points(tally_path)["Zoë"] == 2
+
+
+def test_tally_value_beyond_64_bits_leaves_the_file_untouched(tmp_path):
+    path = str(tmp_path / "board.tally")
+    data_manager = DataManager(SCHEMA_PATH)
+    data_manager.save_file(path, "Board", ENTRIES)
+    with open(path, 'rb') as f:
+        before = f.read()
+    entries = [dict(entry) for entry in ENTRIES]
+    entries[0]["value"] = 8
+    entries[2]["value"] = 2 ** 64
+    with pytest.raises(ValueError, match="64 bits"):
+        data_manager.save_file(path, "Board", entries, ["Alice", "Zoë"])
+    with open(path, 'rb') as f:
+        assert f.read() == before
+
+
+def test_tally_rank_queries_match_a_full_load(tmp_path):
+    path = str(tmp_path / "board.tally")
+    DataManager(SCHEMA_PATH).save_file(path, "Board", ENTRIES)
+    with columnar.ColumnarTally(path) as board:
+        assert [entry["name"] for entry in board.top(3)] == ["Alice", "Bob", "Zoë"]
+        assert [board.rank_of(name) for name in ("Alice", "Bob", "Zoë")] == [1, 2, 3]
+        assert board.rank_of("Nobody") is None
+
+
+def test_sqlite_rank_queries_match_a_full_load(tmp_path):
+    path = str(tmp_path / "board.sqlite")
+    DataManager(SCHEMA_PATH).save_file(path, "Board", ENTRIES)
+    with sqlite_store.SqliteTally(path) as board:
+        assert [entry["name"] for entry in board.top(2, offset=1)] == ["Bob", "Zoë"]
+        assert [board.rank_of(name) for name in ("Alice", "Bob", "Zoë")] == [1, 2, 3]
+        assert board.rank_of("Nobody") is None
+
+
+def test_server_commit_folds_in_a_replayed_journal(tmp_path):
+    import asyncio
+    from server.tally_server import TallyServer
+    path = str(tmp_path / "board.sqlite")
+    DataManager(SCHEMA_PATH).save_file(path, "Board", ENTRIES)
+    tally("inc", path, "Alice", 5, "--journal")
+    server = TallyServer(DataManager(SCHEMA_PATH), path)
+
+    async def commit():
+        server._commit_lock = asyncio.Lock()
+        await server.commit()
+
+    asyncio.run(commit())
+    assert not os.path.exists(journal.journal_path(path))
+    assert points(path)["Alice"] == 12